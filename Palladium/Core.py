@@ -1,27 +1,102 @@
+import sys, time, hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from sulfur.storage import GetStorage
+from sulfur.util import MAX_WORKERS
+
 _refresh_in_progress = False
 
 def SuccessMessage(o: "Plugin | str", pn: str | None = None) -> None:
     print(f"\033[32m{pn or "Palladium"} >> Refreshed {o if isinstance(o, str) else o.GetType().split(':')[1]}\033[0m")
 def UnpackObject(node: "Object", visited: set[str] | None = None) -> "list['Object']":
+    # post-order, so children come before their parent; paths in visited are skipped along with their subtrees
     if visited is None:
         visited = set()
-    
-    node_path = node.GetPath()
-    if node_path in visited:
-        return []
-    
-    visited.add(node_path)
     l: "list['Object']" = []
-    
-    try:
-        children: "list['Object']" = node.GetChildren()
-        for child in children:
-            l.extend(UnpackObject(child, visited))
-    except Exception as e:
-        print(f"\033[33mWarning: Could not get children for {node.GetType()}: {e}\033[0m")
-    
-    l.append(node)
+    for obj in node.Walk(order="post", prune=lambda o, _: o.GetPath() in visited):
+        if obj.GetPath() in visited:
+            continue
+        visited.add(obj.GetPath())
+        l.append(obj)
     return l
+_INPUTS: dict = {
+    "ParentContent": lambda obj: obj.GetParent()._LoadContent(), # NOQA
+    "ParentName": lambda obj: obj.GetParent().GetName(),
+    "ParentPath": lambda obj: obj.GetParent().GetPath(),
+    "ParentType": lambda obj: obj.GetParent().GetType(),
+}
+
+def _IsComponent(obj: "Object") -> bool:
+    return ":" in obj.GetType() and obj.GetType().split(":")[1].startswith("$")
+def _BuildGraph(objects: "list['Object']") -> "dict[str, set[str]]":
+    # {path: paths that must be refreshed first}: components after their parent, parents after their other children
+    paths: set[str] = {obj.GetPath() for obj in objects}
+    depends: dict[str, set[str]] = {path: set() for path in paths}
+    for obj in objects:
+        parent = obj.GetParent()
+        if parent is None or parent.GetPath() not in paths:
+            continue
+        if _IsComponent(obj):
+            depends[obj.GetPath()].add(parent.GetPath())
+        else:
+            depends[parent.GetPath()].add(obj.GetPath())
+    return depends
+def _Fingerprint(obj: "Object") -> str | None:
+    # hash of the inputs declared under Execute.Inputs in the .objtype; None means always recompute
+    from sulfur.pcl import GetRegistry
+    if ":" not in obj.GetType() or obj.GetParent() is None:
+        return None
+    execute: dict = GetRegistry().GetConfig(obj.GetType()).get("Execute") or {}
+    inputs: list[str] = execute.get("Inputs") or []
+    if not inputs or any(name not in _INPUTS for name in inputs):
+        return None
+    digest = hashlib.sha256(obj.GetType().encode())
+    digest.update(repr(execute.get("Command")).encode())
+    for name in inputs:
+        digest.update(b"\0" + name.encode() + b"\0" + str(_INPUTS[name](obj)).encode(errors="surrogatepass"))
+    return digest.hexdigest()
+def _ReadFingerprint(obj: "Object") -> str | None:
+    fingerprint: str | None = GetStorage(obj.GetPath()).ReadMeta(obj.GetPath(), "__Inputs__")
+    return None if fingerprint is None else fingerprint.strip()
+def _WriteFingerprint(obj: "Object", fingerprint: str | None) -> None:
+    GetStorage(obj.GetPath()).WriteMeta(obj.GetPath(), "__Inputs__", fingerprint)
+def _RunScheduled(objects: "list['Object']", sulfur: "ObjectTreeCLUI") -> "tuple[dict[str, float], dict[str, tuple[Object, Exception]], set[str]]":
+    by_path: dict[str, "Object"] = {obj.GetPath(): obj for obj in objects}
+    depends = _BuildGraph(objects)
+    dependents: dict[str, list[str]] = {path: [] for path in depends}
+    for path, before in depends.items():
+        for other in before:
+            dependents[other].append(path)
+    remaining: dict[str, int] = {path: len(before) for path, before in depends.items()}
+    timings: dict[str, float] = {}
+    failures: dict[str, tuple["Object", Exception]] = {}
+    up_to_date: set[str] = set()
+    def Run(path: str) -> None:
+        started = time.perf_counter()
+        try:
+            if by_path[path]._GetDerivedPipeline() is not None: # NOQA
+                up_to_date.add(path)
+                return
+            fingerprint = _Fingerprint(by_path[path])
+            if fingerprint is not None and fingerprint == _ReadFingerprint(by_path[path]):
+                up_to_date.add(path)
+                return
+            if by_path[path]._Execute(otclui=sulfur) is False: # NOQA
+                raise RuntimeError("command did not run (missing dependency or denied Include)")
+            _WriteFingerprint(by_path[path], fingerprint)
+        except Exception as e:
+            failures[path] = (by_path[path], e)
+        finally:
+            timings[path] = time.perf_counter() - started
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        running = {pool.submit(Run, path): path for path, count in remaining.items() if count == 0}
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                for path in dependents[running.pop(future)]:
+                    remaining[path] -= 1
+                    if remaining[path] == 0:
+                        running[pool.submit(Run, path)] = path
+    return timings, failures, up_to_date
 def RefreshAll(node: "Object", sulfur: "ObjectTreeCLUI") -> None:
     global _refresh_in_progress
     
@@ -47,14 +122,17 @@ def RefreshAll(node: "Object", sulfur: "ObjectTreeCLUI") -> None:
         
         filtered_objects = [obj for obj in l if not (":" in obj.GetType() and obj.GetType().split(":")[1] == "Trigger")]
         
-        success_count = 0
-        for obj in filtered_objects:
-            try:
-                obj._Execute(otclui=sulfur)
-                success_count += 1
-            except Exception as e:
-                print(f"\033[31mFailed to refresh {obj.GetType()}: {e}\033[0m")
+        started = time.perf_counter()
+        timings, failures, up_to_date = _RunScheduled(filtered_objects, sulfur)
+        for path, (obj, err) in failures.items():
+            print(f"\033[31mFailed to refresh {obj.GetType()} ({timings[path]:.3f}s): {err}\033[0m")
         
-        SuccessMessage(f"{success_count}/{len(filtered_objects)} objects.")
+        slowest = sorted(((path, seconds) for path, seconds in timings.items() if path not in up_to_date), key=lambda item: item[1], reverse=True)
+        shown = slowest if "-v" in sys.argv else slowest[:5]
+        SuccessMessage(
+            f"{len(filtered_objects) - len(failures)}/{len(filtered_objects)} objects in {time.perf_counter() - started:.3f}s: "
+            f"{len(filtered_objects) - len(failures) - len(up_to_date)} recomputed, {len(up_to_date)} up-to-date."
+            + "".join(f"\n  {unique_objects[path].GetName()}: {seconds:.3f}s" for path, seconds in shown)
+        )
     finally:
         _refresh_in_progress = False
@@ -1,5 +1,6 @@
-import os, yaml, sys # NOQA
+import os, yaml, sys, warnings
 from pathlib import Path
+from sulfur import pcl
 
 PLUGINS_DIR: str = Path(__file__).parent.parent.parent
 
@@ -19,5 +20,16 @@ def GetPluginConfig(name: str) -> dict:
                 return yaml.safe_load(file)
         except FileNotFoundError:
             return {}
+def EnablePlugin(name: str) -> bool:
+    return pcl.EnablePlugin(name)
+def DisablePlugin(name: str) -> bool:
+    return pcl.DisablePlugin(name)
+def RunPCL(command: str) -> None:
+    pcl.RunPCLCommand(command)
 def OpenPCL(loc: str | None = None) -> None:
-    os.system(f'{sys.executable} -m sulfur {loc or '.'} -r pcl')
\ No newline at end of file
+    # loc is deprecated: the prompt runs in-process and does not depend on a workspace
+    if loc is not None:
+        warnings.warn("OpenPCL(loc) is deprecated and will be removed; call OpenPCL() instead.", DeprecationWarning, stacklevel=2)
+        os.system(f'{sys.executable} -m sulfur {loc} -r pcl')
+        return
+    pcl.PCLPrompt()
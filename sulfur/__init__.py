@@ -1,6 +1,10 @@
-import os
-from typing import Any
+import os, json
+from typing import Any, IO, Iterable, Iterator
 from .core import Object
+from .storage import Open, GetStorage
+from .util import MAX_WORKERS
+
+_LOAD_BATCH: int = 512 # objects created per round of mkdir + write calls
 
 def Require(module: Object, d: dict | None = None) -> Any:
     mod: Any = module._Require() # NOQA
@@ -8,4 +12,91 @@ def Require(module: Object, d: dict | None = None) -> Any:
         d[module.GetName()] = mod
     return mod
 def GetObject(file: str) -> Object:
-    return Object(os.path.join(file, ".."))
\ No newline at end of file
+    return Object(os.path.join(file, ".."))
+
+def _AsObject(root: Object | str) -> Object:
+    return root if isinstance(root, Object) else Object(Open(root))
+def DumpRecords(root: Object | str) -> Iterator[dict[str, Any]]:
+    # one record per object in pre-order; path is the chain of names below root and order the position among siblings
+    names: list[str] = []
+    positions: list[int] = []
+    for obj, depth, leaving in _AsObject(root)._WalkEvents(): # NOQA
+        if leaving:
+            continue
+        del names[depth:]
+        names.append(obj.GetName())
+        if len(positions) > depth:
+            positions[depth] += 1
+            del positions[depth + 1:]
+        else:
+            positions.append(0)
+        record: dict[str, Any] = {"path": "/".join(names[1:]), "type": obj.GetType(), "order": positions[depth], "content": obj._GetStorage().ReadContent(obj.GetPath())} # NOQA
+        if obj.IsPacked():
+            record["values"] = obj.GetValues()
+        yield record
+def Dump(root: Object | str, stream: IO[str]) -> int:
+    count: int = 0
+    for record in DumpRecords(root):
+        stream.write(json.dumps(record) + "\n")
+        count += 1
+    return count
+
+def LoadRecords(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+def Load(stream: IO[str] | Iterable[str], root: Object | str) -> int:
+    # records must be in pre-order, as Dump writes them; the loaded objects are added after the existing children of root
+    root = _AsObject(root)
+    root_path: str = root.GetPath()
+    storage = GetStorage(root_path)
+    existing: list[str] = root._GetChildrenNames() # NOQA
+    objects: list[tuple[str, str, str | None, str | None]] = [] # (path, name, type, content)
+    orders: list[tuple[str, list[str]]] = []
+    packed: list[tuple[str, list[str]]] = []
+    open_parents: list[tuple[str, str, list[tuple[int, str]]]] = [("", root_path, [])] # (name, path, [(order, child name)])
+    count: int = 0
+    def Close() -> None:
+        _, path, children = open_parents.pop()
+        if children:
+            names: list[str] = [name for _, name in sorted(children)]
+            orders.append((path, existing + names if path == root_path else names))
+    def Flush() -> None:
+        storage.CreateMany(objects, workers=MAX_WORKERS)
+        for path, names in orders:
+            storage.WriteOrder(path, names)
+        for path, values in packed:
+            storage.WritePacked(path, values)
+        objects.clear()
+        orders.clear()
+        packed.clear()
+    for record in LoadRecords(stream):
+        parts: list[str] = record["path"].split("/") if record["path"] else []
+        if any(part in ["", ".", ".."] or "\\" in part for part in parts):
+            raise ValueError(f"Invalid object path: {record['path']}")
+        if not parts:
+            if root.GetType() is None:
+                objects.append((root_path, "", record["type"] or "Workspace", record.get("content") or ""))
+            continue
+        while len(open_parents) > len(parts):
+            Close()
+        if len(open_parents) != len(parts) or [name for name, _, _ in open_parents[1:]] != parts[:-1]:
+            raise ValueError(f"Record out of pre-order: {record['path']}")
+        if len(parts) == 1 and parts[0] in existing:
+            raise FileExistsError(f"Object already exists: {parts[0]}")
+        siblings: list[tuple[int, str]] = open_parents[-1][2]
+        path: str = os.path.join(open_parents[-1][1], "__Children__", parts[-1])
+        siblings.append((record.get("order", len(siblings)), parts[-1]))
+        open_parents.append((parts[-1], path, []))
+        objects.append((path, parts[-1], record["type"], record.get("content") or ""))
+        if record.get("values") is not None:
+            packed.append((path, record["values"]))
+        count += 1
+        if len(objects) >= _LOAD_BATCH:
+            Flush()
+    while open_parents:
+        Close()
+    Flush()
+    return count
+
+dump, load = Dump, Load
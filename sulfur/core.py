@@ -9,18 +9,23 @@ Est.
 2025
 """
 
-import os, shutil, random, webbrowser, sys, random, stat
+import os, shutil, random, webbrowser, sys, random, stat, json, re, hashlib, marshal, threading, shlex, io, time, tarfile, zipfile
 from importlib import import_module
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
+from contextlib import redirect_stdout, nullcontext
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
 from pathlib import Path
-from sys import argv, executable
-from importlib.util import module_from_spec, spec_from_file_location
+from sys import argv
+from importlib.util import module_from_spec, spec_from_file_location, MAGIC_NUMBER
+from types import CodeType
 from random import randint
 from prompt_toolkit import prompt
 from prompt_toolkit.completion import WordCompleter
 
-from .util import RedPrint, GreenPrint, RunEditor, GetRandomColor, GetCharVariant, LenNoColor, ForceRemove, OBJECT_TYPE_LIST, GetHighlight, ANSI_COLORS, SEP, Interruptible
-from .pcl import Plugin, PluginError, PLUGIN_PATH
+from .util import RedPrint, GetRedPrints, GreenPrint, RunEditor, GetRandomColor, GetCharVariant, ParseCharVariant, LenNoColor, WriteFrame, ANSI_ESCAPE, ForceRemove, OBJECT_TYPE_LIST, GetHighlight, ANSI_COLORS, SEP, MAX_WORKERS, Interruptible, RefreshObjectTypes
+from .pcl import Plugin, PluginError, GetRegistry, PCLPrompt
+from .storage import GetStorage, DirectoryStorage, SQLiteStorage, MetaLog
 
 if os.name == "posix":
     import readline
@@ -30,36 +35,280 @@ controls_distance_message_shown: bool = False
 
 global_storage: dict[str, Any] = {}
 
+_SEARCH_TOKEN: re.Pattern = re.compile(r"\w+")
+_SEARCH_WORD: re.Pattern = re.compile(r"\w+\*?") # a query word answered from the postings alone
+
+_UNLOADED: Any = object() # marks __Content__ that has not been read yet, or a parent that has not been linked
+
+class CodeCache:
+    def __init__(self) -> None:
+        self.codes: dict[str, CodeType] = {} # {hash of (magic, mode, filename, source): code}
+        self.store: str | None = None # directory of marshalled code objects, one per (mode, filename), set per workspace
+        self.hits: int = 0
+        self.misses: int = 0
+    def SetStore(self, path: str | None) -> None:
+        self.store = path
+    def _Header(self, source: str) -> bytes:
+        # an entry is only used by the interpreter that wrote it and for the source it was compiled from
+        return MAGIC_NUMBER + hashlib.sha256(source.encode(errors="surrogatepass")).digest()
+    def Compile(self, source: str, filename: str, mode: str) -> CodeType:
+        key: str = hashlib.sha256(b"\0".join([MAGIC_NUMBER, mode.encode(), filename.encode(errors="surrogatepass"), source.encode(errors="surrogatepass")])).hexdigest()
+        code: CodeType | None = self.codes.get(key)
+        entry: str | None = None if self.store is None else os.path.join(self.store, hashlib.sha256(mode.encode() + b"\0" + filename.encode(errors="surrogatepass")).hexdigest())
+        if code is None and entry is not None:
+            header: bytes = self._Header(source)
+            try:
+                with open(entry, "rb") as file:
+                    code = marshal.load(file) if file.read(len(header)) == header else None
+            except (OSError, EOFError, ValueError, TypeError):
+                code = None
+            if code is not None:
+                self.codes[key] = code
+        if code is not None:
+            self.hits += 1
+            return code
+        self.misses += 1
+        code = self.codes[key] = compile(source, filename, mode)
+        if entry is not None:
+            # overwrites the entry compiled from the previous source of this filename, so edits leave nothing behind
+            try:
+                os.makedirs(self.store, exist_ok=True)
+                with open(entry + ".tmp", "wb") as file:
+                    file.write(self._Header(source))
+                    marshal.dump(code, file)
+                os.replace(entry + ".tmp", entry)
+            except OSError:
+                ...
+        return code
+    def Clear(self) -> None:
+        self.codes.clear()
+    def GetStats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.codes)}
+
+CODE_CACHE: CodeCache = CodeCache()
+
+class ModuleRegistry:
+    def __init__(self) -> None:
+        self.modules: dict[str, tuple[int, int, Any]] = {} # {object path: (mtime_ns, size, module)}
+        self.requires: dict[str, set[str]] = {} # {object path: paths it required while loading}
+        self.dependents: dict[str, set[str]] = {} # {object path: paths that required it while loading}
+        self.loading: list[str] = []
+        self.lock: threading.RLock = threading.RLock() # objects may be executed from several threads, e.g. by a Palladium refresh
+    @staticmethod
+    def _Stat(path: str) -> tuple[int, int] | None:
+        try:
+            st: os.stat_result = GetStorage(path).Stat(path, "__Content__")
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    def Get(self, obj: "Object") -> Any:
+        with self.lock:
+            return self._Get(obj)
+    def _Get(self, obj: "Object") -> Any:
+        path: str = obj.GetPath()
+        if self.loading:
+            self.requires.setdefault(self.loading[-1], set()).add(path)
+            self.dependents.setdefault(path, set()).add(self.loading[-1])
+        self._Validate(path, set())
+        entry: tuple[int, int, Any] | None = self.modules.get(path)
+        if entry is not None:
+            return entry[2]
+        if path in self.loading:
+            RedPrint(f"Circular require of {obj.GetName()}: {' -> '.join(os.path.basename(p) for p in self.loading[self.loading.index(path):])} -> {obj.GetName()}", exit_after=False)
+            return
+        stat_key: tuple[int, int] | None = self._Stat(path)
+        for dep in self.requires.pop(path, set()):
+            self.dependents.get(dep, set()).discard(path)
+        self.loading.append(path)
+        try:
+            module: Any = obj._LoadModule() # NOQA
+        finally:
+            self.loading.pop()
+        if stat_key is not None:
+            self.modules[path] = (*stat_key, module)
+        return module
+    def _Validate(self, path: str, seen: set[str]) -> None:
+        # a module is stale when its own content or any module it required has changed since it was loaded
+        if path in seen or path not in self.modules:
+            return
+        seen.add(path)
+        for dep in list(self.requires.get(path, ())):
+            self._Validate(dep, seen)
+            if dep not in self.modules:
+                self.Invalidate(dep)
+        entry: tuple[int, int, Any] | None = self.modules.get(path)
+        if entry is not None and self._Stat(path) != entry[:2]:
+            self.Invalidate(path)
+    def Invalidate(self, path: str) -> None:
+        stack: list[str] = [path]
+        while stack:
+            current: str = stack.pop()
+            self.modules.pop(current, None)
+            stack.extend(p for p in self.dependents.get(current, ()) if p in self.modules)
+    def Clear(self) -> None:
+        self.modules.clear()
+        self.requires.clear()
+        self.dependents.clear()
+
+MODULES: ModuleRegistry = ModuleRegistry()
+
+class ListOf(list):
+    def OfType(self, type_: str) -> "list[Object]":
+        return [i for i in self if i.GetType() == type_]
+
 class Object:
+    __slots__ = ("__path", "__name", "__type", "__content", "__parent", "__children", "__entries")
     def __init__(self, path: str):
         self.__path: str = os.path.abspath(path)
         self.__name: str = os.path.basename(self.__path)
         self.__type: str | None = None
-        self.__content: str | None = None
+        self.__content: str | None = _UNLOADED
+        self.__parent: Object | None = _UNLOADED
+        self.__children: dict[str, Object] | None = None # only set for nodes of a WorkspaceTree
+        self.__entries: dict[str, os.DirEntry] | None = None
         self._LoadMetadata()
+    @classmethod
+    def _FromTree(cls, path: str, parent: "Object | None") -> "Object":
+        obj: Object = cls.__new__(cls)
+        obj.__path = path
+        obj.__name = os.path.basename(path)
+        obj.__type = None
+        obj.__content = _UNLOADED
+        obj.__parent = _UNLOADED if parent is None else parent
+        obj.__children = None
+        obj.__entries = None
+        return obj
 
+    def _GetStorage(self) -> DirectoryStorage | SQLiteStorage:
+        return GetStorage(self.__path)
     def _LoadMetadata(self):
+        self.__type = self._GetStorage().ReadType(self.__path)
+        self.__content = _UNLOADED if self.__type is not None else None
+    def _Scan(self, children: bool = True) -> "list[Object]":
+        self.__type, names, self.__entries = self._GetStorage().Scan(self.__path, children)
+        self.__content = _UNLOADED if self.__type is not None else None
+        if not children:
+            self.__children = None
+            return []
+        self.__children = {name: Object._FromTree(os.path.join(self.__path, "__Children__", name), self) for name in names}
+        return list(self.__children.values())
+    def _GetStat(self, filename: str) -> os.stat_result:
+        return self._GetStorage().Stat(self.__path, filename, self.__entries)
+    def _SetContent(self, content: str) -> None:
+        self.__content = content
+        if self.__entries:
+            self.__entries.pop("__Content__", None)
+    def _ResetContent(self) -> None:
+        self._SetContent(_UNLOADED)
+    def _GetLoadedChildren(self) -> "list[Object] | None":
+        return None if self.__children is None else list(self.__children.values())
+    def _AttachChild(self, child: "Object") -> None:
+        if self.__children is not None:
+            self.__children[child.GetName()] = child
+    def _DetachChild(self, name: str) -> None:
+        if self.__children is not None:
+            self.__children.pop(name, None)
+    def _RenameChild(self, name: str, new_name: str) -> None:
+        if self.__children is not None:
+            self.__children = {new_name if n == name else n: c for n, c in self.__children.items()}
+    def _Relocate(self, path: str) -> None:
+        self.__path = path
+        self.__name = os.path.basename(path)
+        self.__entries = None
+    def _GetDerivedPipeline(self) -> "ObjectTypePipeline | None":
+        if self.__type is None or ":" not in self.__type:
+            return None
         try:
-            with open(os.path.join(self.__path, "__Type__")) as file:
-                self.__type = file.read().strip()
-            with open(os.path.join(self.__path, "__Content__")) as file:
-                self.__content = file.read()
-            os.makedirs(os.path.join(self.__path, "__Children__"), exist_ok=True)
+            pipeline: ObjectTypePipeline = GetPipeline(self.__type)
         except FileNotFoundError:
-            self.__type = None
+            return None
+        return pipeline if pipeline.derived is not None and self.GetParent() is not None else None
+    def _LoadContent(self) -> str | None:
+        pipeline: ObjectTypePipeline | None = self._GetDerivedPipeline()
+        if pipeline is not None:
+            return pipeline.Derive(self)
+        if self.__content is _UNLOADED:
+            self.__content = self._GetStorage().ReadContent(self.__path)
+        return self.__content
+    def _LoadContentPreview(self, limit: int) -> str | None:
+        # reads at most limit + 1 characters; a result longer than limit means the content was cut off
+        pipeline: ObjectTypePipeline | None = self._GetDerivedPipeline()
+        if pipeline is not None:
+            return pipeline.Derive(self)
+        if self.__content is not _UNLOADED:
+            return self.__content
+        preview: str | None = self._GetStorage().ReadContent(self.__path, limit + 1)
+        if preview is None:
             self.__content = None
+            return None
+        if len(preview) <= limit:
+            self.__content = preview
+        return preview
     def GetChild(self, name: str, _allow_get_comments: bool = False) -> "Object | None":
+        if self.__children is not None:
+            child: Object | None = self.__children.get(name)
+            if child is None or (child.GetType() == "Comment" and not _allow_get_comments):
+                return
+            return child
         child_path = os.path.join(self.__path, "__Children__", name)
-        if os.path.isdir(child_path):
+        if self._GetStorage().Exists(child_path):
             child: Object = Object(child_path)
             if child.GetType() == "Comment" and not _allow_get_comments:
                 return
             return child
         return
+    def _ReadChildrenOrder(self) -> list[str] | None:
+        return self._GetStorage().ReadOrder(self.__path)
+    def _WriteChildrenOrder(self, names: list[str]) -> None:
+        self._GetStorage().WriteOrder(self.__path, names)
+    def _GetChildrenNames(self) -> list[str]:
+        if self.__children is not None:
+            return list(self.__children)
+        return self._GetStorage().ChildNames(self.__path)
     def _GetChildrenPaths(self) -> list[str]:
-        return [str(s) for s in sorted(Path(os.path.join(self.__path, "__Children__")).iterdir(), key=lambda f: f.stat().st_ctime)]
+        if self.__children is not None:
+            return [child.GetPath() for child in self.__children.values()]
+        children_dir: str = os.path.join(self.__path, "__Children__")
+        return [os.path.join(children_dir, name) for name in self._GetChildrenNames()]
     def GetChildren(self) -> "list[Object]":
-        return type("ListOf", (list,), {"OfType": lambda self1, type_: [i for i in self1 if i.GetType() == type_]})([Object(path) for path in self._GetChildrenPaths()])
+        if self.__children is not None:
+            return ListOf(self.__children.values())
+        return ListOf([Object(path) for path in self._GetChildrenPaths()])
+    def _IterChildren(self) -> "Iterator[Object]":
+        if self.__children is not None:
+            yield from list(self.__children.values())
+            return
+        for name in self._GetStorage().ChildNames(self.__path):
+            child: Object = Object._FromTree(os.path.join(self.__path, "__Children__", name), self)
+            child._LoadMetadata()
+            yield child
+    def _WalkEvents(self, prune: "Callable[[Object, int], bool] | None" = None, max_depth: int | None = None) -> "Iterator[tuple[Object, int, bool]]":
+        # yields (object, depth, leaving) once when entering and once when leaving every object, without recursion
+        yield self, 0, False
+        stack: list[tuple[Object, int, Iterator[Object] | None]] = [(self, 0, None if (prune is not None and prune(self, 0)) or max_depth == 0 else self._IterChildren())]
+        while stack:
+            node, depth, children = stack[-1]
+            child: Object | None = next(children, None) if children is not None else None
+            if child is None:
+                stack.pop()
+                yield node, depth, True
+                continue
+            yield child, depth + 1, False
+            descend: bool = (max_depth is None or depth + 1 < max_depth) and not (prune is not None and prune(child, depth + 1))
+            stack.append((child, depth + 1, child._IterChildren() if descend else None))
+    def Walk(self, order: str = "pre", types: list[str] | None = None, names: list[str] | None = None, prune: "Callable[[Object, int], bool] | None" = None, max_depth: int | None = None) -> "Iterator[Object]":
+        # streams this object and its descendants; prune(obj, depth) -> True skips the children of obj
+        if order not in ["pre", "post"]:
+            raise ValueError(f"Unknown walk order: {order}")
+        leaving_wanted: bool = order == "post"
+        for obj, _, leaving in self._WalkEvents(prune, max_depth):
+            if leaving != leaving_wanted:
+                continue
+            if types is not None and obj.GetType() not in types:
+                continue
+            if names is not None and obj.GetName() not in names:
+                continue
+            yield obj
     def GetRandomChild(self, exclude: "list[str] | list[Object] | None" = None, types: list[str] | None = None) -> str:
         choice: str = random.choice(self.GetChildren())
         if choice in exclude or choice.GetName() in exclude or choice.GetPath() in exclude:
@@ -68,6 +317,8 @@ class Object:
             return self.GetRandomChild(exclude=exclude)
         return choice
     def GetParent(self) -> "Object | None":
+        if self.__parent is not _UNLOADED:
+            return self.__parent
         if os.path.basename(os.path.abspath(os.path.join(self.__path, ".."))) == "__Children__":
             return Object(os.path.join(self.__path, "..", ".."))
         return None
@@ -89,61 +340,115 @@ class Object:
     def GetStringContent(self) -> str:
         if self.__type in ["Folder", "Class", "ValueArray", "Workspace", "Comment"]:
             RedPrint(f"Cannot get string content of a {self.__type}.", exit_after=False)
-        return self.__content
+        return self._LoadContent()
     def GetContent(self) -> Any:
         t: str = self.__type
         if ":" in self.__type:
-            try:
-                gc: dict = Plugin.ReadConfig(Plugin.TraceObjectType(self.__type))["GetContent"]
-            except KeyError as err:
-                PluginError(err, Plugin.FromPath(str(Path(Plugin.TraceObjectType(self.__type)).parent)))
-            print(gc)
+            pipeline: ObjectTypePipeline = GetPipeline(self.__type)
+            gc: dict = pipeline.GetContentConfig()
             if gc.get("Enabled", True) is False:
                 RedPrint(f"Cannot get content of a {self.__type}.", exit_after=False)
                 return
             elif gc.get("InheritsFrom"):
                 t = gc["InheritsFrom"]
             elif gc.get("Command"):
-                return eval(gc["Command"], {"this": self, "content": self.__content})
+                return eval(pipeline.GetContentCode(), {"this": self, "content": self._LoadContent()})
         if t in ["Folder", "ValueArray", "Workspace", "Comment"]:
             RedPrint(f"Cannot get content of a {self.__type}.", exit_after=False)
         elif t == "ScriptEval":
             return self._Execute(eval)
         elif t == "Integer":
-            return int(self.__content)
+            return int(self._LoadContent())
         elif t == "Double":
-            return float(self.__content)
+            return float(self._LoadContent())
         elif t == "Boolean":
-            return eval(self.__content.capitalize())
+            return eval(self._LoadContent().capitalize())
         elif t == "Class":
             return self._Class()
         elif t == "Color":
-            return self.__content.split("#")[1]
+            return self._LoadContent().split("#")[1]
         elif t == "SimpleEval":
             from . import GetObject, Require
-            return eval(self.__content, {"this": self, "require": Require})
+            return eval(CODE_CACHE.Compile(self._LoadContent(), self.__path, "eval"), {"this": self, "require": Require})
         else:
-            return self.__content
+            return self._LoadContent()
     def Open(self) -> None:
         if self.__type != "URL":
             RedPrint(f"The Open method is only available for objects of type URL.", exit_after=False)
-        webbrowser.open(self.__content)
+        webbrowser.open(self._LoadContent())
     def _ValueListCheck(self, name: str) -> None:
         if self.__type != "ValueArray":
             RedPrint(f"The {name} method is only available for objects of type ValueArray.", exit_after=False)
-    def GetValues(self) -> list[str]:
+    def IsPacked(self) -> bool:
+        return self.__type == "ValueArray" and self._GetStorage().IsPacked(self.__path)
+    def _PackedKey(self) -> int | None:
+        # number of packed values, None when the values are children; cached rows and search entries are keyed on it
+        if self.__type != "ValueArray" or not self.IsPacked():
+            return None
+        return self._GetStorage().CountPacked(self.__path)
+    def GetValues(self, start: int | None = None, stop: int | None = None) -> list[str]:
         self._ValueListCheck("GetValues")
-        return [Object(c).GetStringContent() for c in self._GetChildrenPaths()]
+        if self.IsPacked():
+            return self._GetStorage().ReadPacked(self.__path, start, stop)
+        return [Object(c).GetStringContent() for c in self._GetChildrenPaths()[start:stop]]
+    def GetValueCount(self) -> int:
+        self._ValueListCheck("GetValueCount")
+        if self.IsPacked():
+            return self._GetStorage().CountPacked(self.__path)
+        return len(self._GetChildrenNames())
     def GetValue(self, i: int) -> str:
         self._ValueListCheck("GetValue")
-        if self.GetChild(str(i), _allow_get_comments=True) is None:
+        if self.IsPacked():
+            values: list[str] = self._GetStorage().ReadPacked(self.__path, i, i + 1) if i >= 0 else []
+            if not values:
+                RedPrint(f"Could not get value at {i}", exit_after=False)
+                return
+            return values[0]
+        child: Object | None = self.GetChild(str(i), _allow_get_comments=True)
+        if child is None:
             RedPrint(f"Could not get value at {i}", exit_after=False)
-        return self.GetChild(str(i)).GetStringContent()
+        return child.GetStringContent()
     def GetRandomValue(self) -> str:
         self._ValueListCheck("GetRandomValue")
-        if not self._GetChildrenPaths():
+        if self.IsPacked():
+            count: int = self._GetStorage().CountPacked(self.__path)
+            if not count:
+                RedPrint(f"No values in {self.__name} to pick from.", exit_after=False)
+                return
+            i: int = randint(0, count - 1)
+            return self._GetStorage().ReadPacked(self.__path, i, i + 1)[0]
+        names: list[str] = self._GetChildrenNames()
+        if not names:
             RedPrint(f"No values in {self.__name} to pick from.", exit_after=False)
-        return self.GetValue(randint(0, len(self._GetChildrenPaths()) - 1))
+        return self.GetChild(random.choice(names), _allow_get_comments=True).GetStringContent()
+    def AppendValues(self, values: list[str]) -> None:
+        self._ValueListCheck("AppendValues")
+        if not self.IsPacked():
+            RedPrint(f"{self.__name} is not packed; run Pack() on it before appending values in bulk.", exit_after=False)
+            return
+        self._GetStorage().AppendPacked(self.__path, [str(value) for value in values])
+    def Pack(self) -> None:
+        # moves the Value children into __Values__ + __Offsets__; comments stay as children
+        self._ValueListCheck("Pack")
+        if self.IsPacked():
+            return
+        values: list[Object] = [child for child in self._IterChildren() if child.GetType() == "Value"]
+        storage: DirectoryStorage | SQLiteStorage = self._GetStorage()
+        storage.WritePacked(self.__path, [child._LoadContent() or "" for child in values])
+        storage.RemoveMany(self.__path, [child.GetName() for child in values])
+        self.__children = None
+    def Unpack(self) -> None:
+        self._ValueListCheck("Unpack")
+        if not self.IsPacked():
+            return
+        storage: DirectoryStorage | SQLiteStorage = self._GetStorage()
+        others: list[str] = storage.ChildNames(self.__path)
+        values: list[str] = storage.ReadPacked(self.__path, 0, None)
+        names: list[str] = [str(i) for i in range(len(values))]
+        storage.CreateMany([(os.path.join(self.__path, "__Children__", name), name, "Value", value) for name, value in zip(names, values)])
+        storage.WriteOrder(self.__path, names + others)
+        storage.WritePacked(self.__path, None)
+        self.__children = None
     def _Class(self):
         if self.__type != "Class":
             RedPrint("Only objects of type Class can be interpreted as a class in a script.", exit_after=False)
@@ -161,66 +466,55 @@ class Object:
             }.get(child.GetType(), Object)(child.GetPath())}
         return type(self.GetName(), (), attributes)()
     def _Require(self):
-        from . import Require
         if self.__type != "ScriptModule":
             RedPrint("Only objects of type ScriptModule can be required in a script.", exit_after=False)
+        return MODULES.Get(self)
+    def _LoadModule(self):
+        from . import Require
         module_vars: dict[str, Any] = {
             "this": self,
             "require": Require
         }
-        exec(f"""
+        exec(CODE_CACHE.Compile(f"""
 class _temp_created_cls:
 {'\n'.join(['    '+ln for ln in self.GetStringContent().split('\n')])}
-""".strip(), module_vars)
+""".strip(), self.__path, "exec"), module_vars)
         return module_vars["_temp_created_cls"]
-    def _Execute(self, protocol: Callable | None = None, force: bool = False, otclui: "ObjectTreeCLUI | None" = None) -> None:
+    def _Execute(self, protocol: Callable | None = None, force: bool = False, otclui: "ObjectTreeCLUI | None" = None) -> Any:
+        # for plugin types, False means the command did not run (missing dependency or denied Include)
         from . import Require
-        with open(os.path.join(self.__path, "__Type__")) as file:
-            content: str = file.read()
-        trace: str | None = Plugin.TraceObjectType(content)
-        if trace is not None:
-            ot_content: dict = Plugin.ReadConfig(trace)
-            can_run: bool = True
-            for dk, dv in ((ot_content["Execute"] or {}).get("Dependencies") or {}).items():
-                if dk not in os.listdir(f"{PLUGIN_PATH}{SEP}enabled"):
-                    RedPrint(f"[pcl] error: dependency not installed: '{dk}{'==' + str(dv['Version'])}'{(' by ' + dv['Author']) if dv.get('Author') else ''}.{(' install here: ' + dv['Source']) if dv.get('Source') else ''}", exit_after=False)
-                    can_run = False
-                    continue
-                try:
-                    pcl_content: dict = Plugin.ReadConfig(f"{PLUGIN_PATH}{SEP}enabled{SEP}{dk}{SEP}.plugin")
-                except FileNotFoundError:
-                    pcl_content = {}
-                if dv.get("Version") and pcl_content.get("Version") and (pcl_content["Version"] != dv["Version"]):
-                    RedPrint(f"[pcl] error: incorrect version of '{dk}' installed ({pcl_content['Version']}). please install '{dk}{'==' + str(dv['Version'])}'{(' here: ' + dv['Source']) if dv.get('Source') else ''}", exit_after=False)
-                    can_run = False
-                if dv.get("Author") and pcl_content.get("Author") and (pcl_content["Author"].lower() != dv["Author"].lower()):
-                    print(f"\033[33m[pcl] warning: dependency author mismatch. installed: '{dk} by {pcl_content['Author']}', dependency: '{dk} by {dv['Author']}'.{(' make sure this dependency was installed from here: ' + dv['Source']) if dv.get('Source') else ''}\033[0m")
-            if not can_run:
-                return
+        if self.__type is not None and ":" in self.__type:
+            pipeline: ObjectTypePipeline = GetPipeline(self.__type)
+            if not pipeline.CheckDependencies():
+                return False
             if not force:
-                importedv: dict = {}
-                for resource in ((ot_content.get("Execute") or {}).get("Include") or {}):
-                    try:
-                        module = Plugin(resource.split(":")[0], enabled=True).Include(resource.split(":")[1], Plugin.FromPath(f"{trace}{SEP}..").name, (Plugin.ReadConfig(f"{trace}{SEP}..{SEP}.plugin") or {}).get("Author") or "__unsigned__")
-                        importedv |= {name: getattr(module, name) for name in dir(module) if not name.startswith("_")}
-                    except IndexError as err:
-                        PluginError(err, Plugin.FromPath(str(Path(Plugin.TraceObjectType(self.__type)).parent)))
-                if None in importedv.values():
-                    return
-                ExecString = lambda sl: ("\n".join(sl) if isinstance(sl, list) else sl).replace('\x00', '')
-                protocol = lambda s, v: exec(ExecString((ot_content["Execute"] or {}).get("Command") or "print('No command specified for this operation.')"), v | importedv | {"global_storage": global_storage, "sulfur": otclui})
-        return protocol(self.__content, {
+                return pipeline.Execute(self, otclui)
+        if protocol is exec or protocol is eval:
+            run, mode = protocol, protocol.__name__
+            protocol = lambda s, v: run(CODE_CACHE.Compile(s, self.__path, mode), v)
+        return protocol(self._LoadContent(), {
             "this": self,
             "require": Require
         })
-    def __str__(self):
-        global controls_distance
+    def _DisplayType(self) -> str | None:
         t = self.__type
-        if ":" in t:
+        if t is not None and ":" in t:
             try:
-                t = (Plugin.ReadConfig(Plugin.TraceObjectType(t))["Display"] or {}).get("InheritsFrom") or "UnknownType"
+                t = (GetRegistry().GetConfig(t)["Display"] or {}).get("InheritsFrom") or "UnknownType"
             except FileNotFoundError:
                 t = "UnknownType"
+        return t
+    def __str__(self):
+        global controls_distance
+        t = self._DisplayType()
+        content: str | None = ""
+        if t in ["Comment", "Color"] or (t == "ScriptEval" and "-e" in argv):
+            content = self._LoadContent()
+        elif t in ["Value", "String", "Integer", "Boolean", "Double", "Character", "URL"]:
+            content = self._LoadContentPreview(controls_distance)
+        if content is None:
+            # __Content__ is missing; such an object is shown like one without metadata
+            return f"\033[92mUnknownType\033[0m \033[94m{self.__name}\033[0m"
         
         def _CanFitInLine(base_str: str, content_preview: str) -> bool:
             base_length = LenNoColor(base_str)
@@ -229,10 +523,10 @@ class _temp_created_cls:
             return (base_length + content_length) <= max_total_length
         
         if t == "Comment":
-            return f"\033[90m{self.__content}\033[0m"
-        elif t == "Value" and len(self.__content) != 0:
+            return f"\033[90m{content}\033[0m"
+        elif t == "Value" and len(content) != 0:
             base_str = f"\033[94m{self.__name}:\033[0m "
-            content_preview = self.__content.replace('\n', ' ').replace('true', '\033[1;33mtrue\033[0m').replace('false', '\033[1;33mfalse\033[0m')
+            content_preview = content.replace('\n', ' ').replace('true', '\033[1;33mtrue\033[0m').replace('false', '\033[1;33mfalse\033[0m')
             if _CanFitInLine(base_str, content_preview):
                 return base_str + content_preview
             else:
@@ -240,7 +534,7 @@ class _temp_created_cls:
                 max_total_length = controls_distance - 10
                 max_content_length = max_total_length - base_length - 3  # -3 for "..."
                 if max_content_length > 10:
-                    plain_content = self.__content.replace('\n', ' ')
+                    plain_content = content.replace('\n', ' ')
                     truncated_plain = plain_content[:max_content_length]
                     truncated_formatted = truncated_plain.replace('true', '\033[1;33mtrue\033[0m').replace('false', '\033[1;33mfalse\033[0m')
                     return base_str + truncated_formatted + "..."
@@ -249,7 +543,7 @@ class _temp_created_cls:
             return f"\033[94m{self.__name}\033[0m"
         elif t == "ScriptEval" and "-e" in argv:
             try:
-                eval_content = str(eval(self.__content))
+                eval_content = str(eval(CODE_CACHE.Compile(content, self.__path, "eval")))
             except Exception as err: # NOQA
                 eval_content = str(err.__class__.__name__)
             base_str = f"\033[92m{self.__type}\033[0m \033[94m{self.__name}:\033[0m "
@@ -257,9 +551,9 @@ class _temp_created_cls:
                 return base_str + eval_content
             else:
                 return f"\033[92m{self.__type}\033[0m \033[94m{self.__name}\033[0m"
-        elif t in ["String", "Integer", "Boolean", "Double", "Character", "URL"] and len(self.__content) != 0:
+        elif t in ["String", "Integer", "Boolean", "Double", "Character", "URL"] and len(content) != 0:
             base_str = f"\033[92m{self.__type}\033[0m \033[94m{self.__name}:\033[0m "
-            content_preview = self.__content.replace('\n', ' ').replace('true', '\033[1;33mtrue\033[0m').replace('false', '\033[1;33mfalse\033[0m')
+            content_preview = content.replace('\n', ' ').replace('true', '\033[1;33mtrue\033[0m').replace('false', '\033[1;33mfalse\033[0m')
             if _CanFitInLine(base_str, content_preview):
                 return base_str + content_preview
             else:
@@ -267,33 +561,554 @@ class _temp_created_cls:
                 max_total_length = controls_distance - 50
                 max_content_length = max_total_length - base_length - 3  # -3 for "..."
                 if max_content_length > 10:
-                    plain_content = self.__content.replace('\n', ' ')
+                    plain_content = content.replace('\n', ' ')
                     truncated_plain = plain_content[:max_content_length]
                     truncated_formatted = truncated_plain.replace('true', '\033[1;33mtrue\033[0m').replace('false', '\033[1;33mfalse\033[0m')
                     return base_str + truncated_formatted + "..."
                 return f"\033[92m{self.__type}\033[0m \033[94m{self.__name}\033[0m"
         elif t == "Color":
-            color: str = self.__content.split("#")[0]
+            color: str = content.split("#")[0]
             base_str = f"\033[92m{self.__type}\033[0m \033[94m{self.__name}:\033[0m "
-            color_preview = f"{eval(self.__content.split('#')[1])}{ANSI_COLORS[int(color)] if color.isdigit() else color}\033[0m"
+            color_preview = f"{eval(content.split('#')[1])}{ANSI_COLORS[int(color)] if color.isdigit() else color}\033[0m"
             if _CanFitInLine(base_str, color_preview):
                 return base_str + color_preview
             else:
                 return f"\033[92m{self.__type}\033[0m \033[94m{self.__name}\033[0m"
+        elif t == "ValueArray" and self.IsPacked():
+            return f"\033[92m{self.__type}\033[0m \033[94m{self.__name}:\033[0m \033[90m{self._GetStorage().CountPacked(self.__path)} packed values\033[0m"
         return f"\033[92m{self.__type or 'UnknownType'}\033[0m \033[94m{self.__name}\033[0m"
 
+class LineCache:
+    def __init__(self, root_path: str):
+        self.root_path: str = os.path.abspath(root_path)
+        self.entries: dict[str, list] = {} # {path relative to the root: [*key, rendered line]}
+        self.log: MetaLog = MetaLog(self.root_path, "__Cache__")
+        self.hits: int = 0
+        self.misses: int = 0
+    def Load(self) -> None:
+        entries, changes = self.log.Load()
+        self.entries = entries if isinstance(entries, dict) else {}
+        for path, entry in changes:
+            if entry is None:
+                self.entries.pop(path, None)
+            else:
+                self.entries[path] = entry
+    def Save(self) -> None:
+        try:
+            self.log.Save(lambda: self.entries, len(self.entries))
+        except OSError:
+            return
+    def _RelPath(self, path: str) -> str:
+        return os.path.relpath(path, self.root_path).replace(os.sep, "/")
+    @staticmethod
+    def _Key(node: Object) -> list | None:
+        t: str | None = node._DisplayType() # NOQA
+        if (t == "ScriptEval" and "-e" in argv) or node._GetDerivedPipeline() is not None: # NOQA
+            return None
+        try:
+            type_stat: os.stat_result = node._GetStat("__Type__") # NOQA
+            content_stat: os.stat_result = node._GetStat("__Content__") # NOQA
+        except FileNotFoundError:
+            return None
+        return [type_stat.st_mtime_ns, content_stat.st_mtime_ns, content_stat.st_size, node._PackedKey(), t, controls_distance, "-c" in argv, "-e" in argv] # NOQA
+    def Render(self, node: Object) -> str:
+        key: list | None = self._Key(node)
+        path: str = self._RelPath(node.GetPath())
+        entry: list | None = self.entries.get(path)
+        if key is not None and entry is not None and entry[:-1] == key:
+            self.hits += 1
+            return entry[-1]
+        self.misses += 1
+        text: str = str(node)
+        if key is not None:
+            self.entries[path] = key + [text]
+            self.log.Record(path, self.entries[path])
+        return text
+    def Forget(self, path: str) -> None:
+        path = self._RelPath(path)
+        for p in [p for p in self.entries if p == path or p.startswith(path + "/")]:
+            del self.entries[p]
+            self.log.Record(p, None)
+    def GetStats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+class SearchIndex:
+    # inverted index over the names, types and content of every object, persisted in __Search__ and kept current by the CLUI mutations
+    VERSION: int = 2
+    def __init__(self, root_path: str):
+        self.root_path: str = os.path.abspath(root_path)
+        self.docs: dict[str, list] = {} # {path relative to the root: [type mtime, content mtime, content size, packed count, type, name, tokens]}
+        self.postings: dict[str, set[str]] = {} # {"n:" / "t:" / "c:" + token: paths relative to the root}
+        self.log: MetaLog = MetaLog(self.root_path, "__Search__")
+        self.lock: threading.RLock = threading.RLock() # a Palladium refresh writes components, and so updates the index, from pool threads
+    def Load(self) -> bool:
+        with self.lock:
+            snapshot, changes = self.log.Load()
+            if not isinstance(snapshot, dict) or snapshot.get("version") != self.VERSION:
+                self.docs, self.postings = {}, {}
+                return False
+            self.docs = snapshot["docs"]
+            self.postings = {token: set(paths) for token, paths in snapshot["postings"].items()}
+            for rel_path, doc in changes:
+                if doc is None:
+                    self._Drop(rel_path)
+                else:
+                    self._Add(rel_path, doc)
+            self.log.pending.clear()
+            return True
+    def Save(self) -> None:
+        with self.lock:
+            try:
+                self.log.Save(lambda: {"version": self.VERSION, "docs": self.docs, "postings": {token: sorted(paths) for token, paths in self.postings.items()}}, len(self.docs))
+            except OSError:
+                return
+    def _RelPath(self, path: str) -> str:
+        return os.path.relpath(path, self.root_path).replace(os.sep, "/")
+    def GetPath(self, rel_path: str) -> str:
+        return self.root_path if rel_path == "." else os.path.join(self.root_path, *rel_path.split("/"))
+    @staticmethod
+    def _Key(obj: Object) -> list | None:
+        try:
+            type_stat: os.stat_result = obj._GetStat("__Type__") # NOQA
+            content_stat: os.stat_result = obj._GetStat("__Content__") # NOQA
+        except FileNotFoundError:
+            return None
+        return [type_stat.st_mtime_ns, content_stat.st_mtime_ns, content_stat.st_size, obj._PackedKey()] # NOQA
+    @staticmethod
+    def _Tokenize(text: str) -> set[str]:
+        return set(_SEARCH_TOKEN.findall(text.lower()))
+    @staticmethod
+    def _Text(obj: Object) -> str:
+        # the stored content rather than a derived one, plus the values of a packed ValueArray
+        text: str = obj._GetStorage().ReadContent(obj.GetPath()) or "" # NOQA
+        if obj.GetType() == "ValueArray" and obj.IsPacked():
+            text += "\n" + "\n".join(obj.GetValues())
+        return text
+    def _Drop(self, rel_path: str) -> None:
+        doc: list | None = self.docs.pop(rel_path, None)
+        if doc is None:
+            return
+        for token in doc[-1]:
+            paths: set[str] | None = self.postings.get(token)
+            if paths is not None:
+                paths.discard(rel_path)
+                if not paths:
+                    del self.postings[token]
+        self.log.Record(rel_path, None)
+    def _Add(self, rel_path: str, doc: list) -> None:
+        self._Drop(rel_path)
+        self.docs[rel_path] = doc
+        for token in doc[-1]:
+            self.postings.setdefault(token, set()).add(rel_path)
+        self.log.Record(rel_path, doc)
+    def Update(self, obj: Object) -> None:
+        rel_path: str = self._RelPath(obj.GetPath())
+        with self.lock:
+            key: list | None = self._Key(obj)
+            if key is None:
+                self._Drop(rel_path)
+                return
+            t: str = obj.GetType() or "UnknownType"
+            tokens: list[str] = sorted({"t:" + t.lower()} | {"n:" + token for token in self._Tokenize(obj.GetName())} | {"c:" + token for token in self._Tokenize(self._Text(obj))})
+            doc: list | None = self.docs.get(rel_path)
+            if doc is not None and doc[4:] == [t, obj.GetName(), tokens]:
+                doc[:4] = key # a rewrite with the same tokens is not worth saving the index for
+                return
+            self._Add(rel_path, key + [t, obj.GetName(), tokens])
+    def Forget(self, path: str) -> None:
+        path = self._RelPath(path)
+        with self.lock:
+            for rel_path in [p for p in self.docs if p == path or p.startswith(path + "/")]:
+                self._Drop(rel_path)
+    def Move(self, old: str, new: str) -> None:
+        # re-keys the documents of a renamed subtree; the renamed object itself still needs an Update for its new name
+        old, new = self._RelPath(old), self._RelPath(new)
+        with self.lock:
+            for rel_path in [p for p in self.docs if p == old or p.startswith(old + "/")]:
+                doc: list = self.docs[rel_path]
+                self._Drop(rel_path)
+                self._Add(new + rel_path.removeprefix(old), doc)
+    def Sync(self, path: str) -> int:
+        # re-indexes the objects under path whose files changed since they were indexed and drops the ones that are gone
+        path = os.path.abspath(path)
+        prefix: str = self._RelPath(path)
+        seen: set[str] = set()
+        updated: int = 0
+        with self.lock:
+            for obj, _, leaving in Object(path)._WalkEvents(): # NOQA
+                if leaving:
+                    continue
+                rel_path: str = self._RelPath(obj.GetPath())
+                seen.add(rel_path)
+                doc: list | None = self.docs.get(rel_path)
+                if doc is None or doc[:4] != self._Key(obj):
+                    self.Update(obj)
+                    updated += 1
+            for rel_path in [p for p in self.docs if (prefix == "." or p == prefix or p.startswith(prefix + "/")) and p not in seen]:
+                self._Drop(rel_path)
+        return updated
+    def _Lookup(self, field: str, word: str) -> set[str]:
+        # word matches a whole token, or every token starting with it when it ends in *
+        word = word.lower()
+        if word.endswith("*"):
+            return {path for token, paths in self.postings.items() if token.startswith(field + word[:-1]) for path in paths}
+        return set(self.postings.get(field + word, set()))
+    def _Contains(self, field: str, text: str) -> set[str]:
+        # paths with a token containing each word character run of text; a superset of the ones that contain text
+        result: set[str] | None = None
+        for part in self._Tokenize(text):
+            paths: set[str] = {path for token, token_paths in self.postings.items() if token.startswith(field) and part in token[2:] for path in token_paths}
+            result = paths if result is None else result & paths
+        return set(self.docs) if result is None else result
+    def Query(self, words: list[str], field: str, type_: str | None = None) -> list[str]:
+        # field is "n:" to match names or "c:" to match content; results are in workspace order.
+        # words (or word* prefixes) are answered from the postings alone; anything else is a substring, which for content
+        # is confirmed against the stored files of the candidates
+        with self.lock:
+            substring: bool = not all(_SEARCH_WORD.fullmatch(word) for word in words)
+            results: set[str] = set(self.docs) if type_ is None else set(self.postings.get("t:" + type_.lower(), set()))
+            if substring:
+                text: str = " ".join(words).lower()
+                results &= self._Contains(field, text)
+                if field == "n:":
+                    results = {rel_path for rel_path in results if text in self.docs[rel_path][5].lower()}
+                else:
+                    results = {rel_path for rel_path in results if self._Confirm(rel_path, text)}
+            else:
+                for word in words:
+                    results &= self._Lookup(field, word)
+            orders: dict[str, dict[str, int]] = {}
+            return sorted(results, key=lambda rel_path: self._OrderKey(rel_path, orders))
+    def _Confirm(self, rel_path: str, text: str) -> bool:
+        path: str = self.GetPath(rel_path)
+        if not GetStorage(path).Exists(path):
+            self._Drop(rel_path)
+            return False
+        obj: Object = Object(path)
+        if self.docs[rel_path][:4] != self._Key(obj):
+            self.Update(obj)
+        return text in self._Text(obj).lower()
+    def _OrderKey(self, rel_path: str, orders: dict[str, dict[str, int]]) -> list[int]:
+        # sibling positions along the path, so results come out in the order the tree is drawn
+        key: list[int] = []
+        parent: str = self.root_path
+        for name in rel_path.split("/")[1::2]:
+            if parent not in orders:
+                orders[parent] = {n: i for i, n in enumerate(GetStorage(parent).ChildNames(parent))}
+            key.append(orders[parent].get(name, -1))
+            parent = os.path.join(parent, "__Children__", name)
+        return key
+    def GetStats(self) -> dict[str, int]:
+        with self.lock:
+            return {"documents": len(self.docs), "tokens": len(self.postings)}
+
+class ObjectTypePipeline:
+    # everything _Execute and GetContent need from one .objtype, resolved once per registry build
+    def __init__(self, object_type: str):
+        registry = GetRegistry()
+        self.object_type: str = object_type
+        self.trace: str = Plugin.TraceObjectType(object_type)
+        self.config: dict = registry.GetConfig(object_type)
+        self.generation: int = registry.generation
+        self.plugin: Plugin = Plugin.FromPath(f"{self.trace}{SEP}..")
+        self.author: str = (registry.plugin_configs.get(self.plugin.name) or {}).get("Author") or "__unsigned__"
+        self.problems: list[tuple[bool, str]] = [] # (is error, message) printed on every run, like before
+        self.can_run: bool = True
+        self._execute_code: CodeType | None = None
+        self._content_code: CodeType | None = None
+        self.derived: str | None = (self.config.get("GetContent") or {}).get("Derived")
+        self._derived_code: CodeType | None = None
+        self._derived_values: dict[str, tuple[tuple, str]] = {} # {object path: (parent key, value)}
+        self._included: tuple[list, dict[str, Any]] = ([], {}) # (modules, names), only ever replaced whole
+        self._included_lock: threading.Lock = threading.Lock() # a Palladium refresh runs objects of one type from several threads
+        for dk, dv in ((self.config.get("Execute") or {}).get("Dependencies") or {}).items():
+            if dk not in registry.enabled_names:
+                self.problems.append((True, f"[pcl] error: dependency not installed: '{dk}{'==' + str(dv['Version'])}'{(' by ' + dv['Author']) if dv.get('Author') else ''}.{(' install here: ' + dv['Source']) if dv.get('Source') else ''}"))
+                self.can_run = False
+                continue
+            pcl_content: dict = registry.plugin_configs.get(dk) or {}
+            if dv.get("Version") and pcl_content.get("Version") and (pcl_content["Version"] != dv["Version"]):
+                self.problems.append((True, f"[pcl] error: incorrect version of '{dk}' installed ({pcl_content['Version']}). please install '{dk}{'==' + str(dv['Version'])}'{(' here: ' + dv['Source']) if dv.get('Source') else ''}"))
+                self.can_run = False
+            if dv.get("Author") and pcl_content.get("Author") and (pcl_content["Author"].lower() != dv["Author"].lower()):
+                self.problems.append((False, f"\033[33m[pcl] warning: dependency author mismatch. installed: '{dk} by {pcl_content['Author']}', dependency: '{dk} by {dv['Author']}'.{(' make sure this dependency was installed from here: ' + dv['Source']) if dv.get('Source') else ''}\033[0m"))
+    def CheckDependencies(self) -> bool:
+        for error, message in self.problems:
+            if error:
+                RedPrint(message, exit_after=False)
+            else:
+                print(message)
+        return self.can_run
+    def GetIncludedNames(self) -> dict[str, Any] | None:
+        modules: list = []
+        for resource in ((self.config.get("Execute") or {}).get("Include") or {}):
+            try:
+                modules.append(Plugin(resource.split(":")[0], enabled=True).Include(resource.split(":")[1], self.plugin.name, self.author))
+            except IndexError as err:
+                PluginError(err, Plugin.FromPath(str(Path(self.trace).parent)))
+        with self._included_lock:
+            included, names = self._included
+            if len(modules) != len(included) or any(a is not b for a, b in zip(modules, included)):
+                names = {}
+                for module in modules:
+                    names |= {name: getattr(module, name) for name in dir(module) if not name.startswith("_")}
+                self._included = (modules, names)
+        if None in names.values():
+            return None
+        return names
+    def GetExecuteCode(self) -> CodeType:
+        if self._execute_code is None:
+            command: list[str] | str = (self.config["Execute"] or {}).get("Command") or "print('No command specified for this operation.')"
+            self._execute_code = CODE_CACHE.Compile(("\n".join(command) if isinstance(command, list) else command).replace('\x00', ''), self.trace, "exec")
+        return self._execute_code
+    def Execute(self, obj: Object, otclui: "ObjectTreeCLUI | None") -> bool:
+        from . import Require
+        names: dict[str, Any] | None = self.GetIncludedNames()
+        if names is None:
+            return False
+        exec(self.GetExecuteCode(), {"this": obj, "require": Require} | names | {"global_storage": global_storage, "sulfur": otclui})
+        return True
+    def GetContentConfig(self) -> dict:
+        try:
+            return self.config["GetContent"]
+        except KeyError as err:
+            PluginError(err, Plugin.FromPath(str(Path(self.trace).parent)))
+    def GetContentCode(self) -> CodeType:
+        if self._content_code is None:
+            self._content_code = CODE_CACHE.Compile(self.GetContentConfig()["Command"], self.trace, "eval")
+        return self._content_code
+
+    def Derive(self, obj: Object) -> str:
+        # computes the content of obj from its parent, memoized on the parent's path, type and __Content__ mtime
+        parent: Object = obj.GetParent()
+        try:
+            st: os.stat_result = parent._GetStat("__Content__") # NOQA
+            key: tuple = (parent.GetPath(), parent.GetType(), st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            key = (parent.GetPath(), parent.GetType(), None, None)
+        memo: tuple[tuple, str] | None = self._derived_values.get(obj.GetPath())
+        if memo is not None and memo[0] == key:
+            return memo[1]
+        if self._derived_code is None:
+            self._derived_code = CODE_CACHE.Compile(self.derived, self.trace, "eval")
+        value: str = str(eval(self._derived_code, {"this": obj, "parent": parent, "content": parent._LoadContent()})) # NOQA
+        self._derived_values[obj.GetPath()] = (key, value)
+        return value
+
+_pipelines: dict[str, ObjectTypePipeline] = {}
+def GetPipeline(object_type: str) -> ObjectTypePipeline:
+    pipeline: ObjectTypePipeline | None = _pipelines.get(object_type)
+    if pipeline is None or pipeline.generation != GetRegistry().generation or pipeline.config is not GetRegistry().GetConfig(object_type):
+        pipeline = _pipelines[object_type] = ObjectTypePipeline(object_type)
+    return pipeline
+def ReloadPlugins() -> None:
+    # what a fresh process would see: the plugins are scanned again and nothing resolved from the previous scan is kept
+    GetRegistry().Rebuild()
+    _pipelines.clear()
+    MODULES.Clear()
+    RefreshObjectTypes()
+
+class WorkspaceTree:
+    def __init__(self, root_path: str):
+        self.root_path: str = os.path.abspath(root_path)
+        self.root: Object | None = None
+        self.nodes: dict[str, Object] = {}
+    def Load(self, fold: Callable[[Object, int], bool] | None = None) -> Object:
+        # fold(node, depth) -> True leaves the children of node unscanned
+        self.nodes = {}
+        self.root = Object._FromTree(self.root_path, None) # NOQA
+        self._Walk(self.root, 0, fold)
+        return self.root
+    def Expand(self, node: Object, depth: int, fold: Callable[[Object, int], bool] | None = None) -> None:
+        if node._GetLoadedChildren() is None: # NOQA
+            self._Walk(node, depth, fold)
+    def _Walk(self, start: Object, depth: int, fold: Callable[[Object, int], bool] | None) -> None:
+        stack: list[tuple[Object, int]] = [(start, depth)]
+        while stack:
+            node, depth = stack.pop()
+            self.nodes[node.GetPath()] = node
+            children: list[Object] = node._Scan(children=fold is None or not fold(node, depth)) # NOQA
+            stack.extend((child, depth + 1) for child in reversed(children))
+    def Find(self, obj: Object) -> Object:
+        return self.nodes.get(obj.GetPath(), obj)
+    @staticmethod
+    def _Subtree(node: Object) -> list[Object]:
+        nodes: list[Object] = []
+        stack: list[Object] = [node]
+        while stack:
+            current: Object = stack.pop()
+            nodes.append(current)
+            stack.extend(current._GetLoadedChildren() or []) # NOQA
+        return nodes
+    def Add(self, parent: Object, path: str) -> Object:
+        node: Object = Object._FromTree(path, parent) # NOQA
+        node._Scan() # NOQA
+        parent._AttachChild(node) # NOQA
+        self.nodes[path] = node
+        return node
+    def Remove(self, node: Object) -> None:
+        for current in self._Subtree(node):
+            self.nodes.pop(current.GetPath(), None)
+        if node.GetParent() is not None:
+            node.GetParent()._DetachChild(node.GetName()) # NOQA
+    def Rename(self, node: Object, new_name: str) -> None:
+        old_path: str = node.GetPath()
+        new_path: str = os.path.join(os.path.dirname(old_path), new_name)
+        if node.GetParent() is not None:
+            node.GetParent()._RenameChild(node.GetName(), new_name) # NOQA
+        for current in self._Subtree(node):
+            self.nodes.pop(current.GetPath(), None)
+            current._Relocate(new_path + current.GetPath().removeprefix(old_path)) # NOQA
+            self.nodes[current.GetPath()] = current
+
+_ARCHIVE_FILES: list[str] = ["__Type__", "__Content__", "__Order__", "__Values__"]
+def _ArchiveName(root: Object, obj: Object) -> str:
+    rel: str = os.path.relpath(obj.GetPath(), root.GetPath())
+    return root.GetName() if rel == "." else f"{root.GetName()}/{rel.replace(os.sep, '/')}"
+def _ReadArchiveEntries(obj: Object, name: str) -> list[tuple[str, bytes, float]]:
+    entries: list[tuple[str, bytes, float]] = []
+    storage: DirectoryStorage | SQLiteStorage = obj._GetStorage() # NOQA
+    for filename, data in [("__Type__", storage.ReadType(obj.GetPath())), ("__Content__", storage.ReadContent(obj.GetPath()))]:
+        if data is not None:
+            entries.append((f"{name}/{filename}", data.encode(), storage.Stat(obj.GetPath(), filename).st_mtime))
+    # the order is always written out, so children whose position came from ctime keep it on the other machine
+    if obj.IsPacked():
+        entries.append((f"{name}/__Values__", json.dumps(obj.GetValues()).encode(), storage.Stat(obj.GetPath(), "__Content__").st_mtime))
+    children: list[str] = obj._GetChildrenNames() # NOQA
+    if children:
+        entries.append((f"{name}/__Order__", "".join(child + "\n" for child in children).encode(), time.time()))
+    return entries
+def _AddToArchive(archive: tarfile.TarFile | zipfile.ZipFile, name: str, data: bytes, mtime: float) -> None:
+    if isinstance(archive, zipfile.ZipFile):
+        info: zipfile.ZipInfo = zipfile.ZipInfo(name, time.localtime(mtime)[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        archive.writestr(info, data)
+    else:
+        info: tarfile.TarInfo = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(mtime)
+        archive.addfile(info, io.BytesIO(data))
+def ExportArchive(root: Object, path: str) -> int:
+    # files are read ahead on a thread pool while the archive is written in pre-order, so memory stays bounded
+    archive: tarfile.TarFile | zipfile.ZipFile = zipfile.ZipFile(path, "w") if path.endswith(".zip") else tarfile.open(path, "w:gz")
+    pending: deque[Future] = deque()
+    count: int = 0
+    def Flush(limit: int) -> None:
+        nonlocal count
+        while len(pending) > limit:
+            for name, data, mtime in pending.popleft().result():
+                _AddToArchive(archive, name, data, mtime)
+            count += 1
+    with archive, ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for obj in root.Walk():
+            pending.append(pool.submit(_ReadArchiveEntries, obj, _ArchiveName(root, obj)))
+            Flush(MAX_WORKERS * 4)
+        Flush(0)
+    return count
+def _IterArchive(path: str) -> Iterator[tuple[str, bytes]]:
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    yield info.filename, archive.read(info)
+        return
+    with tarfile.open(path, "r:*") as archive:
+        for member in archive:
+            if member.isfile():
+                yield member.name, archive.extractfile(member).read()
+def ImportArchive(path: str, root: Object) -> int:
+    # the children of the archived root are added to root in one pass; its own type and content are ignored
+    storage: DirectoryStorage | SQLiteStorage = root._GetStorage() # NOQA
+    existing: list[str] = root._GetChildrenNames() # NOQA
+    top: str | None = None
+    count: int = 0
+    for name, data in _IterArchive(path):
+        parts: list[str] = name.split("/")
+        top = parts[0] if top is None else top
+        *dirs, filename = parts[1:] or [""]
+        if (parts[0] != top or "\\" in name or filename not in _ARCHIVE_FILES or len(dirs) % 2
+                or any(part in ["", ".", ".."] for part in dirs) or any(d != "__Children__" for d in dirs[::2])):
+            raise ValueError(f"unexpected entry in archive: {name}")
+        if not dirs:
+            if filename == "__Order__":
+                imported: list[str] = [child for child in data.decode().split("\n") if child]
+                clashes: list[str] = [child for child in imported if child in existing]
+                if clashes:
+                    raise FileExistsError(f"objects already exist in {root.GetName()}: {', '.join(clashes)}")
+                root._WriteChildrenOrder(existing + imported) # NOQA
+            continue
+        target: str = os.path.join(root.GetPath(), *dirs)
+        if filename == "__Type__":
+            if len(dirs) == 2 and dirs[1] in existing:
+                raise FileExistsError(f"object already exists in {root.GetName()}: {dirs[1]}")
+            storage.Create(os.path.join(root.GetPath(), *dirs[:-2]), dirs[-1], data.decode(), "", ordered=False)
+            count += 1
+        elif filename == "__Content__":
+            storage.WriteContent(target, data.decode())
+        elif filename == "__Values__":
+            storage.WritePacked(target, json.loads(data))
+        else:
+            storage.WriteOrder(target, [child for child in data.decode().split("\n") if child])
+    if top is None:
+        raise ValueError("archive is empty")
+    return count
+
 class ObjectTreeCLUI:
     def __init__(self, root_path: str):
         self.root = Object(root_path)
+        self.tree: WorkspaceTree = WorkspaceTree(root_path)
+        self.lines: LineCache = LineCache(root_path)
+        self.search: SearchIndex = SearchIndex(root_path)
+        self.viewer_mode: bool = False
+        self.collapsed: set[str] = set() # paths relative to the workspace root, persisted in __Collapsed__
+        self.depth_limit: int | None = None
+        self.page_size: int | None = None
+        self.page: int = 0
+        self._expanded: set[str] = set() # nodes opened past the depth limit
+        self._rendered: dict[Object, list[tuple]] = {} # {node: (kind, node, indent) rows of its subtree}
+        self._heads: dict[tuple, str] = {}
+        self._controls: dict[tuple, tuple] = {}
+        self._node_index: list[tuple[Object, int]] = [] # (node, indent) by order char of the last frame
+        self._end_index: list[Object] = []
+        self._frame_nodes: int = 0 # rows of _node_index that belong to the frame; search results are numbered after them
+        self._redraw: bool = False
+        self._dirty: bool = False # a command changed the tree since _node_index was built
+        self._unknown: bool = False
+        self.restart: list[str] | None = None # new argv[1:] when a command asked for a relaunch
+        self.commands: dict[str, Callable] = {
+            "q": exit,
+            "c": lambda: (os.system("clear") if "-r" not in argv else None, self.Redraw()),
+            "re": lambda: (ReloadPlugins(), self.Reload(), GreenPrint("Sulfur refreshed!"), self.Redraw())
+        }
     def InitRoot(self) -> None:
-        with open(os.path.join(self.root.GetPath(), "__Content__"), "w") as file:
-            file.write("")
-        with open(os.path.join(self.root.GetPath(), "__Type__"), "w") as file:
-            file.write(f"Workspace")
-        self.root._LoadMetadata() # NOQA
-    def Display(self, node: Object | None = None, indent: int = 0, order: int = 0, commands: dict[str, Any] | None = None, viewer_mode: bool = False) -> (int, dict[str, Any]):
+        storage: DirectoryStorage | SQLiteStorage = GetStorage(self.root.GetPath())
+        storage.Init(self.root.GetPath())
+        self.depth_limit = self._GetIntOption("-l")
+        self.page_size = self._GetIntOption("-w")
+        self._LoadCollapsed()
+        self.lines.Load()
+        if self.search.Load():
+            self.search.Update(self.root) # Init rewrote the root files
+        else:
+            self.search.Sync(self.root.GetPath())
+        CODE_CACHE.SetStore(storage.GetBytecodeStore(self.root.GetPath()))
+        self.root = self.tree.Load(self._IsFolded)
+    @staticmethod
+    def _GetIntOption(option: str) -> int | None:
+        if option not in argv:
+            return None
+        i: int = argv.index(option)
+        try:
+            value: str = argv[i + 1]
+        except IndexError:
+            RedPrint(f"{option} option requires an argument.", exit_after=False)
+            exit(1)
+        if not value.isdigit() or int(value) == 0:
+            RedPrint(f"{option} option argument must be a positive digit", exit_after=False)
+            exit(1)
+        return int(value)
+    def _ApplyDistanceOption(self) -> None:
         global controls_distance, controls_distance_message_shown
-
         if "-d" in argv:
             i: int = argv.index("-d")
             try:
@@ -309,308 +1124,584 @@ class ObjectTreeCLUI:
                     exit(1)
                 controls_distance = int(ncd)
                 if (controls_distance < 50 or controls_distance > 150) and not controls_distance_message_shown:
-                    RedPrint(f"WARNING! -d number under 50 or over 200 can make the text unreadable! 60-125 is recommended.", exit_after=False)
+                    RedPrint(f"WARNING! -d number under 50 or over 200 can make the text unreadable! 60-125 is recommended.", exit_after=False, error=False)
                 if not controls_distance_message_shown:
-                    RedPrint(f"Set -d number to {controls_distance}", exit_after=False)
+                    RedPrint(f"Set -d number to {controls_distance}", exit_after=False, error=False)
                     controls_distance_message_shown = True
-        node = node or self.root
-        order_char: str = GetCharVariant(order)
+        else:
+            controls_distance = 100
+    def _RelPath(self, node: Object) -> str:
+        return os.path.relpath(node.GetPath(), self.tree.root_path).replace(os.sep, "/")
+    def _LoadCollapsed(self) -> None:
+        self.collapsed = {path for path in (GetStorage(self.tree.root_path).ReadMeta(self.tree.root_path, "__Collapsed__") or "").split("\n") if path}
+    def _SaveCollapsed(self) -> None:
+        GetStorage(self.tree.root_path).WriteMeta(self.tree.root_path, "__Collapsed__", "".join(path + "\n" for path in sorted(self.collapsed)))
+    def _MoveCollapsed(self, old: str, new: str | None) -> None:
+        # re-keys (or drops, when new is None) the fold state of a renamed or deleted subtree
+        moved: set[str] = {path for path in self.collapsed if path == old or path.startswith(old + "/")}
+        self._expanded = {path for path in self._expanded if not (path == old or path.startswith(old + "/"))}
+        if not moved:
+            return
+        self.collapsed -= moved
+        if new is not None:
+            self.collapsed |= {new + path.removeprefix(old) for path in moved}
+        self._SaveCollapsed()
+    def _IsFolded(self, node: Object, depth: int) -> bool:
+        if depth == 0:
+            return False
+        path: str = self._RelPath(node)
+        if path in self.collapsed:
+            return True
+        return self.depth_limit is not None and depth >= self.depth_limit and path not in self._expanded
+    def ToggleFold(self, node: Object, depth: int) -> None:
+        node = self.tree.Find(node)
+        path: str = self._RelPath(node)
+        if self._IsFolded(node, depth):
+            self.collapsed.discard(path)
+            self._expanded.add(path)
+            self.tree.Expand(node, depth, lambda n, d: n is not node and self._IsFolded(n, d))
+        else:
+            self.collapsed.add(path)
+            self._expanded.discard(path)
+        self._SaveCollapsed()
+        self.MarkDirty(node)
+    def MarkDirty(self, node: Object) -> None:
+        # drops the cached text of a node and the cached rows of every ancestor that contains them
+        self._dirty = True
+        current: Object | None = self.tree.Find(node)
+        self._heads.pop((0, current), None)
+        self._controls.pop((0, current), None)
+        for child in current._GetLoadedChildren() or []: # NOQA
+            if child._GetDerivedPipeline() is not None: # NOQA
+                self._heads.pop((0, child), None)
+        while current is not None:
+            self._rendered.pop(current, None)
+            if current is self.root or current.GetPath() == self.root.GetPath():
+                break
+            parent: Object | None = current.GetParent()
+            current = None if parent is None else self.tree.Find(parent)
+    def _ForgetSubtree(self, node: Object) -> None:
+        for current in self.tree._Subtree(node): # NOQA
+            self._rendered.pop(current, None)
+            for kind in (0, 1):
+                self._heads.pop((kind, current), None)
+                self._controls.pop((kind, current), None)
+    def _RepairUnknownType(self, node: Object) -> Object:
+        t: str = node.GetType()
+        if ":" not in t:
+            return node
+        try:
+            GetRegistry().GetConfig(t)
+        except FileNotFoundError:
+            parent: Object = node.GetParent()
+            content: str = node._LoadContent() or "" # NOQA
+            self.DeleteChild(parent, node.GetName())
+            self.AddChild(parent, node.GetName(), "UnknownType", content)
+            return parent.GetChild(node.GetName(), _allow_get_comments=True)
+        return node
+    def _RenderSubtree(self, node: Object, indent: int) -> list[tuple]:
+        rows: list[tuple] | None = self._rendered.get(node)
+        if rows is not None:
+            return rows
+        frames: list[tuple[Object, int, Iterator[Object] | None, list[tuple]]] = []
+        def Open(current: Object, depth: int) -> list[tuple] | None:
+            cached: list[tuple] | None = self._rendered.get(current)
+            if cached is not None:
+                return cached
+            children: Iterator[Object] | None = None
+            if not self._IsFolded(current, depth):
+                self.tree.Expand(current, depth, self._IsFolded)
+                children = iter(current.GetChildren())
+            frames.append((current, depth, children, [(0, current, depth)]))
+        Open(node, indent)
+        while frames:
+            current, depth, children, rows = frames[-1]
+            child: Object | None = next(children, None) if children is not None else None
+            if child is not None:
+                cached: list[tuple] | None = Open(self._RepairUnknownType(child), depth + 1)
+                if cached is not None:
+                    rows.extend(cached)
+                continue
+            frames.pop()
+            if children is not None and current.GetType() != "Comment":
+                rows.append((1, current, depth))
+            self._rendered[current] = rows
+            if frames:
+                frames[-1][3].extend(rows)
+        return rows
+    def _GetHead(self, kind: int, node: Object, indent: int) -> str:
+        head: str | None = self._heads.get((kind, node))
+        if head is None:
+            head = self._heads[(kind, node)] = self._NodeHead(node, indent) if kind == 0 else self._EndHead(indent)
+        return head
+    def _GetControls(self, kind: int, node: Object, indent: int) -> tuple:
+        controls: tuple | None = self._controls.get((kind, node))
+        if controls is None:
+            controls = self._controls[(kind, node)] = self._NodeControls(node, indent) if kind == 0 else self._EndControls(node)
+        return controls
+    def _NodeHead(self, node: Object, indent: int) -> str:
+        text: str = self.lines.Render(node)
+        if self._IsFolded(node, indent):
+            text += " \033[90m(...)\033[0m"
+        return "  " * indent + text + " " + GetRandomColor("-" * (controls_distance - indent * 2 - LenNoColor(text)))
+    @staticmethod
+    def _ResolveTypes(node: Object) -> tuple[str, str, str, str, bool]:
         t, et, edt, ht = [node.GetType()] * 4
         ea = True
         if ":" in t:
             try:
-                et = (Plugin.ReadConfig(Plugin.TraceObjectType(t))["Execute"] or {}).get("InheritsFrom") or t
-                edt = ((Plugin.ReadConfig(Plugin.TraceObjectType(t))["Display"] or {}).get("Editor") or {}).get("InheritsFrom") or t
-                ht = ((Plugin.ReadConfig(Plugin.TraceObjectType(t))["Editor"] or {}).get("Highlights") or {}).get("InheritsFrom") or "UnknownType"
-                ea = (Plugin.ReadConfig(Plugin.TraceObjectType(t))["Editor"] or {}).get("Enabled", True)
+                config: dict = GetRegistry().GetConfig(t)
+                et = (config["Execute"] or {}).get("InheritsFrom") or t
+                edt = ((config["Display"] or {}).get("Editor") or {}).get("InheritsFrom") or t
+                ht = ((config["Editor"] or {}).get("Highlights") or {}).get("InheritsFrom") or "UnknownType"
+                ea = t in GetRegistry().editable_types
             except AttributeError as err:
                 PluginError(err, Plugin.FromPath(str(Path(Plugin.TraceObjectType(t)).parent)))
-            except FileNotFoundError as err: # NOQA
-                self.DeleteChild(node.GetParent(), node.GetName())
-                self.AddChild(node.GetParent(), node.GetName(), "UnknownType", node.GetContent())
-        print("  " * indent + str(node), GetRandomColor("-" * (controls_distance - indent * 2 - LenNoColor(str(node)))),
-              f" {'toggled' if edt == "Boolean" else ('example' if edt == 'Color' else ('browser' if edt == 'URL' else 'execute'))}: [.{order_char}]" if edt in (["Script", "ScriptEval", "ShellScript", "Color", "URL", "Boolean"] + Plugin.GetExecutableObjectTypes(Plugin.GetEnabledPlugins())) and not viewer_mode else f"\033[90m {'toggled' if edt == 'Boolean' else ('example' if edt == 'Color' else ('browser' if edt == 'URL' else 'execute'))}: \033[9m[.{order_char}]\033[0m",
-              f" view/edit: [e{order_char}]" if node.GetType() not in ["Folder", "Class", "ValueArray", "Workspace"] and not viewer_mode and ea else f"\033[90m view/edit: \033[9m[e{order_char}]\033[0m",
-              f" delete: [d{order_char}]" if indent != 0 and not viewer_mode else f"\033[90m delete: \033[9m[d{order_char}]\033[0m",
-              f" rename: [r{order_char}]" if indent != 0 and node.GetType() not in ["Value", "Comment"] and not viewer_mode else f"\033[90m rename: \033[9m[r{order_char}]\033[0m") if "-r" not in argv else ...
-        commands: dict[str, Any] = (commands or {}) | {
-            "q": exit,
-            "c": lambda: (os.system("clear"), self.Display(viewer_mode=viewer_mode), exit()),
-            "re": lambda: (GreenPrint("Sulfur refreshed!"), self.Display(viewer_mode=viewer_mode), exit())
-        }
-        if not viewer_mode:
+        return t, et, edt, ht, ea
+    def _NodeControls(self, node: Object, indent: int) -> tuple:
+        viewer_mode: bool = self.viewer_mode
+        t, et, edt, ht, ea = self._ResolveTypes(node)
+        return (
+            ('toggled' if edt == "Boolean" else ('example' if edt == 'Color' else ('browser' if edt == 'URL' else 'execute')), ".", (edt in ["Script", "ScriptEval", "ShellScript", "Color", "URL", "Boolean"] or edt in GetRegistry().executable_types) and not viewer_mode),
+            ("view/edit", "e", t not in ["Folder", "Class", "ValueArray", "Workspace"] and not viewer_mode and ea),
+            ("delete", "d", indent != 0 and not viewer_mode),
+            ("rename", "r", indent != 0 and t not in ["Value", "Comment"] and not viewer_mode),
+            ("expand" if self._IsFolded(node, indent) else "collapse", "x", indent != 0 and t != "Comment")
+        )
+    def _NodeAction(self, key: str, node: Object, indent: int) -> Callable | None:
+        if key == "x":
+            if indent == 0 or node.GetType() == "Comment":
+                return lambda: RedPrint(f"Objects of type {node.GetType()} cannot be collapsed.", exit_after=False)
+            return lambda: (self.ToggleFold(node, indent), self.Redraw())
+        if self.viewer_mode:
+            return
+        t, et, edt, ht, ea = self._ResolveTypes(node)
+        if key == "e":
             if ea and t not in ["Folder", "Class", "ValueArray", "Workspace"]:
-                commands[f"e{order_char}"] = lambda: (RunEditor(os.path.join(node.GetPath(), "__Content__"), GetHighlight(ht) + (((Plugin.ReadConfig(Plugin.TraceObjectType(t))["Editor"] or {}).get("Highlights") or {}).get("List") or []) if ":" in t else ()), GreenPrint("Modification commited."), self.Display(viewer_mode=viewer_mode), exit())
-            else:
-                commands[f"e{order_char}"] = lambda: RedPrint(f"Objects of type {t} cannot be viewed/edited.", exit_after=False)
-            if et in (["Script", "ScriptEval", "ShellScript"] + Plugin.GetExecutableObjectTypes(Plugin.GetEnabledPlugins())):
-                commands[f".{order_char}"] = lambda: (print(), node._Execute({ # NOQA
+                return lambda: (self._Edit(node.GetPath(), GetHighlight(ht) + (((GetRegistry().GetConfig(t)["Editor"] or {}).get("Highlights") or {}).get("List") or []) if ":" in t else ()), node._ResetContent(), self.MarkDirty(node), GreenPrint("Modification commited."), self.Redraw()) # NOQA
+            return lambda: RedPrint(f"Objects of type {t} cannot be viewed/edited.", exit_after=False)
+        if key == ".":
+            if et in ["Script", "ScriptEval", "ShellScript"] or et in GetRegistry().executable_types:
+                return lambda: (print(), node._Execute({ # NOQA
                     "Script": exec,
-                    "ScriptEval": lambda *_, **__: print(node._Execute(eval), otclui=self), # NOQA
+                    "ScriptEval": lambda *_, **__: print(node._Execute(eval, otclui=self)), # NOQA
                     "ShellScript": lambda *_, **__: os.system(node.GetContent()),
-                }.get(et, None), force=et != t, otclui=self), print(), self.Display(viewer_mode=viewer_mode), exit())
+                }.get(et, None), force=et != t, otclui=self), print(), self.Redraw())
             elif et == "Color":
-                commands[f".{order_char}"] = lambda: print(f"\n\n{eval(node.GetStringContent().split('#')[1])}{node.GetName()}: {node.GetStringContent().split('#')[0]}\n\nHello, world!\033[0m\n\n")
+                return lambda: print(f"\n\n{eval(node.GetStringContent().split('#')[1])}{node.GetName()}: {node.GetStringContent().split('#')[0]}\n\nHello, world!\033[0m\n\n")
             elif et == "Boolean":
-                commands[f".{order_char}"] = lambda: (
-                    exec("with open(f'{node.GetPath()}{SEP}__Content__', 'w') as file: file.write(str(not node.GetContent()).lower())", {"node": node, "SEP": SEP}),
-                    self.Display(viewer_mode=viewer_mode),
-                    exit()
-                )
+                return lambda: (self.Write(node, str(not node.GetContent()).lower()), self.Redraw())
             elif et == "URL":
-                commands[f".{order_char}"] = lambda: webbrowser.open(node.GetContent())
-            else:
-                commands[f".{order_char}"] = lambda: RedPrint(f"Objects of type {et} cannot be executed.", exit_after=False)
-            if indent != 0 and node.GetType() not in ["Value", "Comment"]:
-                commands[f"r{order_char}"] = Interruptible(lambda: (self.RenameChild(Object(os.path.join(node.GetPath(), "..", "..")), node.GetName(), input("\033[91mNew Name: \033[0m")), GreenPrint("Successfully renamed object."), self.Display(), exit()))
-            else:
-                commands[f"r{order_char}"] = lambda: RedPrint(f"Objects of type {node.GetType()} cannot be renamed.", exit_after=False)
+                return lambda: webbrowser.open(node.GetContent())
+            return lambda: RedPrint(f"Objects of type {et} cannot be executed.", exit_after=False)
+        if key == "r":
+            if indent != 0 and t not in ["Value", "Comment"]:
+                return Interruptible(lambda: (self.RenameChild(node.GetParent(), node.GetName(), input("\033[91mNew Name: \033[0m")), GreenPrint("Successfully renamed object."), self.Redraw()))
+            return lambda: RedPrint(f"Objects of type {t} cannot be renamed.", exit_after=False)
+        if key == "d":
             if indent != 0:
-                commands[f"d{order_char}"] = lambda: (self.DeleteChild(Object(os.path.join(node.GetPath(), "..", "..")), node.GetName()), GreenPrint("Successfully removed object."), self.Display(), exit())
-            else:
-                commands[f"d{order_char}"] = lambda: RedPrint(f"Objects of type {node.GetType()} cannot be deleted.", exit_after=False)
-        for child_name in node._GetChildrenPaths(): # NOQA
-            child = node.GetChild(child_name, _allow_get_comments=True)
-            if child:
-                new_order, new_commands = self.Display(child, indent + 1, order + 1, commands, viewer_mode=viewer_mode)
-                order = new_order
-                commands = new_commands
-        if node.GetType() == "Comment":
-            return order, commands or {}
-        add_order: int = 0
-        while True:
-            if f"a{GetCharVariant(add_order)}" in commands.keys():
-                add_order += 1
-                continue
-            break
-        add_order_char: str = GetCharVariant(add_order)
+                return lambda: (self.DeleteChild(node.GetParent(), node.GetName()), GreenPrint("Successfully removed object."), self.Redraw())
+            return lambda: RedPrint(f"Objects of type {t} cannot be deleted.", exit_after=False)
+    @staticmethod
+    def _EndHead(indent: int) -> str:
+        return "  " * indent + "\033[90m  ...\033[0m" + " " + ("\033[90m-\033[0m" * (controls_distance - indent * 2 - 2 - 3))
+    def _EndControls(self, node: Object) -> tuple:
+        viewer_mode: bool = self.viewer_mode
+        return (
+            ("comment", "c", not viewer_mode),
+            (f"add {'value' if node.GetType() == 'ValueArray' else 'child'}", "a", not viewer_mode and node.GetType() not in ["Value", "Comment"])
+        )
+    def _EndAction(self, key: str, node: Object) -> Callable | None:
+        if self.viewer_mode:
+            return
+        if key == "c":
+            return lambda: (self.AddChild(node, self._NewCommentName(node), "Comment", "# " + input("\033[90m# ")), print("\033[0m"), GreenPrint(f"Successfully created comment."), self.Redraw())
+        if node.GetType() in ["Value", "Comment"]:
+            return lambda: RedPrint(f"{node.GetType()}s can only have children of type Comment.", exit_after=False)
         value_list: bool = node.GetType() == "ValueArray"
-        print("  " * indent + "\033[90m  ...\033[0m", ("\033[90m-\033[0m" * (controls_distance - indent * 2 - 2 - 3)),
-            f" comment: [c{add_order_char}]" if not viewer_mode else f"\033[90m comment: \033[9m[c{add_order_char}]\033[0m",
-            f" add {'value' if value_list else 'child'}: [a{add_order_char}]" if not viewer_mode and node.GetType() not in ["Value", "Comment"] else f"\033[90m add {'value' if value_list else 'child'}: \033[9m[a{add_order_char}]\033[0m"
-        ) if "-r" not in argv else ...
+        if value_list and node.IsPacked():
+            return Interruptible(lambda: (node.AppendValues([input("\033[91mValue: \033[0m")]), self.search.Update(node), self.MarkDirty(node), GreenPrint("Successfully created value."), self.Redraw()))
         obj_type: str = ""
         def GetObjectType(new: bool = True) -> str:
             nonlocal obj_type
             if not new:
                 return obj_type
             while True:
-                RedPrint("Child Type:", exit_after=False)
+                RedPrint("Child Type:", exit_after=False, error=False)
                 q3: str = prompt(
                     "- ",
                     completer=WordCompleter(OBJECT_TYPE_LIST, ignore_case=True)
-                )
+                ) if sys.stdin.isatty() else input("- ")
                 if q3 not in OBJECT_TYPE_LIST:
-                    RedPrint(f"Invalid object type: {q3}", exit_after=False)
-                    RedPrint(f"Run [h] for a list of object types.", exit_after=False)
+                    RedPrint(f"Invalid object type: {q3}", exit_after=False, error=False)
+                    RedPrint(f"Run [h] for a list of object types.", exit_after=False, error=False)
                     continue
                 obj_type = q3
                 return q3
-        if not viewer_mode:
-            if node.GetType() not in ["Value", "Comment"]:
-                commands[f"a{add_order_char}"] = Interruptible(lambda: (
-                    RunEditor(
-                        os.path.join(
-                            self.AddChild(
-                                node,
-                                str(len(node._GetChildrenPaths())) if value_list else input("\033[91mChild Name: \033[0m"), # NOQA
-                                "Value" if value_list else GetObjectType(),
-                                ""
-                            ) or "",
-                            "__Content__"
-                        ),
-                        GetHighlight(GetObjectType(new=False))
-                    ),
-                    GreenPrint(f"Successfully created {'value' if value_list else 'object'}."),
-                    self.Display(viewer_mode=viewer_mode),
-                    exit()
-                ))
+        return Interruptible(lambda: (
+            self._Edit(
+                self.AddChild(
+                    node,
+                    str(len(node._GetChildrenPaths())) if value_list else input("\033[91mChild Name: \033[0m"), # NOQA
+                    "Value" if value_list else GetObjectType(),
+                    ""
+                ),
+                GetHighlight(GetObjectType(new=False))
+            ),
+            GreenPrint(f"Successfully created {'value' if value_list else 'object'}."),
+            self.Redraw()
+        ))
+    def _Edit(self, path: str | None, highlights: list[str]) -> None:
+        if path is None:
+            return
+        with GetStorage(path).Checkout(path) as local:
+            RunEditor(os.path.join(local, "__Content__"), highlights)
+        self.search.Update(Object(path))
+    def _ResolveCommand(self, q: str) -> Callable | None:
+        # [cmd] is a global command or an action key followed by the order char of a row of the last frame
+        if q in self.commands:
+            return self.commands[q]
+        key, i = q[:1], ParseCharVariant(q[1:])
+        if i is None:
+            return
+        if key in ["e", ".", "d", "r", "x"] and i < len(self._node_index):
+            node, indent = self._node_index[i]
+            return self._NodeAction(key, node, indent)
+        if key in ["c", "a"] and i < len(self._end_index):
+            return self._EndAction(key, self._end_index[i])
+    @staticmethod
+    def _NewCommentName(node: Object) -> str:
+        names: set[str] = set(node._GetChildrenNames()) # NOQA
+        i: int = 0
+        while f"Comment{i}" in names:
+            i += 1
+        return f"Comment{i}"
+    @staticmethod
+    def _FormatControls(controls: tuple, order_char: str) -> str:
+        return " ".join(f" {label}: [{key}{order_char}]" if enabled else f"\033[90m {label}: \033[9m[{key}{order_char}]\033[0m" for label, key, enabled in controls)
+    def Redraw(self) -> None:
+        self._redraw = True
+    def _DrawFrame(self) -> None:
+        rows: list[tuple] = self._RenderSubtree(self.root, 0)
+        first, last = 0, len(rows)
+        if self.page_size is not None:
+            pages: int = max(1, -(-len(rows) // self.page_size))
+            self.page = min(self.page, pages - 1)
+            first, last = self.page * self.page_size, (self.page + 1) * self.page_size
+        self._node_index = []
+        self._end_index = []
+        self._dirty = False
+        render: bool = "-r" not in argv
+        lines: list[str] = []
+        for i, (kind, node, indent) in enumerate(rows):
+            if kind == 0:
+                order_char: str = GetCharVariant(len(self._node_index))
+                self._node_index.append((node, indent))
+            else:
+                order_char = GetCharVariant(len(self._end_index))
+                self._end_index.append(node)
+            if render and first <= i < last:
+                lines.append(self._GetHead(kind, node, indent) + " " + self._FormatControls(self._GetControls(kind, node, indent), order_char))
+        self._frame_nodes = len(self._node_index)
+        self.search.Save()
+        if self.page_size is not None:
+            lines.append(f"\033[90mpage {self.page + 1}/{pages} ({len(rows)} rows)\033[0m  next page: [pn]  previous page: [pp]")
+        if render:
+            WriteFrame("".join(line + "\n" for line in lines), paged="-p" in argv)
+            self.lines.Save()
+    def _ReadBatch(self) -> Iterator[str]:
+        # -r "cmd;;cmd", -r - (one command per line from stdin) or -r @file
+        i: int = argv.index("-r")
+        try:
+            source: str = argv[i + 1]
+        except IndexError:
+            RedPrint("-r option requires an argument.", exit_after=False)
+            exit(1)
+        if source == "-":
+            stream = sys.stdin
+        elif source.startswith("@"):
+            try:
+                stream = open(source[1:])
+            except OSError as err:
+                RedPrint(f"Could not read commands from '{source[1:]}': {err}", exit_after=False)
+                exit(1)
+        else:
+            yield from [cmd.strip("[]") for cmd in source.split(";;")]
+            return
+        # readline() rather than iteration, so prompts that call input() consume the lines after their command
+        stdin, sys.stdin = sys.stdin, stream
+        try:
+            while line := stream.readline():
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield from [cmd.strip().strip("[]") for cmd in line.split(";;")]
+        finally:
+            sys.stdin = stdin
+            if stream is not stdin:
+                stream.close()
+    def _RunBatch(self) -> None:
+        as_json: bool = "-j" in argv
+        failed: bool = False
+        for q in self._ReadBatch():
+            start: float = time.perf_counter()
+            out: io.StringIO = io.StringIO()
+            record: dict[str, Any] = {"command": q, "status": "ok"}
+            red_prints: int = GetRedPrints()[0]
+            try:
+                with redirect_stdout(out) if as_json else nullcontext():
+                    if self._dirty:
+                        # the last command changed the tree without redrawing, maybe because it failed; order chars resolve against the tree as it is now
+                        self._DrawFrame()
+                    self._redraw = self._unknown = False
+                    self._RunCommand(q)
+                    if self._redraw:
+                        self._DrawFrame()
+                if self._unknown:
+                    failed = True
+                    record["status"] = "unknown"
+                elif GetRedPrints()[0] != red_prints:
+                    # the command reported its failure through RedPrint instead of raising
+                    failed = True
+                    record["status"] = "error"
+                    record["error"] = ANSI_ESCAPE.sub("", GetRedPrints()[1])
+            except SystemExit as err:
+                record["status"] = "exit"
+                record["code"] = err.code or 0
+            except EOFError:
+                record["status"] = "cancelled"
+            except KeyboardInterrupt:
+                record["status"] = "exit"
+                record["code"] = 130
+            except Exception as err:
+                if "-v" in argv and not as_json:
+                    raise err
+                failed = True
+                record["status"] = "error"
+                record["error"] = f"{err.__class__.__name__}: {err}"
+                if not as_json:
+                    RedPrint(f"Error: {err}", exit_after=False)
+            if as_json:
+                record["time"] = round(time.perf_counter() - start, 6)
+                record["output"] = ANSI_ESCAPE.sub("", out.getvalue())
+                print(json.dumps(record), flush=True)
+            if record["status"] == "exit":
+                exit(record["code"])
+            if self.restart is not None:
+                return
+        exit(1 if failed else 0)
+    def Display(self, viewer_mode: bool = False) -> None:
+        self._ApplyDistanceOption()
+        if viewer_mode != self.viewer_mode:
+            self.viewer_mode = viewer_mode
+            self._rendered.clear()
+            self._controls.clear()
+        self._DrawFrame()
+        if "-r" in argv:
+            self._RunBatch()
+            return
+        try:
+            while True:
+                q: str = input("[cmd] ")
+                self._redraw = False
+                self._RunCommand(q)
+                if self.restart is not None:
+                    return
+                if self._redraw:
+                    self._DrawFrame()
+        except (KeyboardInterrupt, EOFError):
+            ...
+    def _RunCommand(self, q: str) -> None:
+        node: Object = self.root
+        action: Callable | None = self._ResolveCommand(q)
+        viewer_mode: bool = self.viewer_mode
+        if q == "h":
+            print("List of object types:")
+            for t in OBJECT_TYPE_LIST:
+                print(f"- {GetRandomColor(t, force=True)}")
+        elif q == "hc":
+            GreenPrint("Hint: run [n -c] or [nh -c] or start sulfur with the -c option (sulfur (...) -c) to enter color mode where some items are easier to tell apart.")
+            print(*[GetRandomColor(p) for p in "This line will appear colorful in color mode. Try it yourself!".split(" ")])
+            print("\nList of colors (for Color object):")
+            print(*[f"\033[{k}m{k}: {v}\033[0m" for k, v in ANSI_COLORS.items()], "24-bit colors are also supported.", sep="\n")
+        elif q in ["au", "cr"]:
+            GreenPrint(__doc__)
+        elif q in ["pn", "pp"] and self.page_size is not None:
+            self.page = max(0, self.page + (1 if q == "pn" else -1))
+            self.Redraw()
+        elif q.startswith("x") and action is not None:
+            action()
+        elif viewer_mode:
+            RedPrint(f"\033[91mUnknown command or insufficient permissions to run: [{q}]\033[0m", exit_after=False)
+            self._unknown = True
+        elif q.startswith("nh"):
+            GreenPrint("Relaunching sulfur here...")
+            self.restart = [node.GetPath()] + shlex.split(q.removeprefix("nh"), posix=os.name != "nt")
+        elif q.startswith("n"):
+            GreenPrint("Relaunching sulfur...")
+            self.restart = shlex.split(q.removeprefix("n"), posix=os.name != "nt")
+        elif q == "xp" or q.startswith("xp "):
+            target: str = q.removeprefix("xp").strip() or f"{node.GetName()}.export.tar.gz"
+            if os.path.exists(target):
+                RedPrint(f"{target} already exists! Delete it with the [rmxp] command or move it manually first before making a new export.", exit_after=False)
+                return
+            GreenPrint("Export process started.")
+            start: float = time.perf_counter()
+            count: int = ExportArchive(node, target)
+            GreenPrint(f"Export completed! {count} objects in {time.perf_counter() - start:.2f}s. See results in {target}")
+        elif q == "rmxp" or q.startswith("rmxp "):
+            targets: list[str] = [q.removeprefix("rmxp").strip()] if q != "rmxp" else [f"{node.GetName()}.export{ext}" for ext in [".tar.gz", ".zip", ""]]
+            target: str | None = next((path for path in targets if os.path.exists(path)), None)
+            if target is None:
+                RedPrint("No export to delete!", exit_after=False)
+            elif os.path.isdir(target):
+                shutil.rmtree(target, onerror=ForceRemove)
+                GreenPrint("Current export deleted.")
+            else:
+                os.remove(target)
+                GreenPrint("Current export deleted.")
+        elif q.startswith("import "):
+            source: str = q.removeprefix("import ").strip()
+            GreenPrint("Import process started.")
+            start: float = time.perf_counter()
+            try:
+                count: int = ImportArchive(source, node)
+            except (OSError, ValueError, tarfile.TarError, zipfile.BadZipFile) as err:
+                RedPrint(f"Import failed: {err}", exit_after=False)
             else:
-                commands[f"a{add_order_char}"] = lambda: RedPrint(f"{node.GetType()}s can only have children of type Comment.", exit_after=False)
-            commands[f"c{add_order_char}"] = lambda: (self.AddChild(node, f"Comment{add_order}", "Comment", "# " + input("\033[90m# ")), print("\033[0m"), GreenPrint(f"Successfully created comment."), self.Display(viewer_mode=viewer_mode), exit())
-        if not indent:
+                GreenPrint(f"Import completed! {count} objects in {time.perf_counter() - start:.2f}s.")
+            self.search.Sync(node.GetPath())
+            self.Reload()
+            self.Redraw()
+        elif q in ["reset", "reset+q"]:
+            RedPrint(f"/!\\ Are you sure you want to delete ALL objects in \033[3m{node.GetPath()}\033[0m", exit_after=False, error=False)
             try:
                 while True:
-                    q: list[str] | str = ""
-                    if "-r" in argv:
-                        i: int = argv.index("-r")
-                        try:
-                            cmds: list[str] = [cmd.strip("[]") for cmd in argv[i + 1].split(";;")]
-                        except IndexError:
-                            RedPrint("-r option requires an argument.", exit_after=False)
-                            exit(1)
-                        else:
-                            q = cmds
-                    else:
-                        q = input("[cmd] ")
-                    for q in q if isinstance(q, list) else [q]:
-                        if q == "h":
-                            print("List of object types:")
-                            for t in OBJECT_TYPE_LIST:
-                                print(f"- {GetRandomColor(t, force=True)}")
-                        elif q == "hc":
-                            GreenPrint("Hint: run [n -c] or [nh -c] or start sulfur with the -c option (sulfur (...) -c) to enter color mode where some items are easier to tell apart.")
-                            print(*[GetRandomColor(p) for p in "This line will appear colorful in color mode. Try it yourself!".split(" ")])
-                            print("\nList of colors (for Color object):")
-                            print(*[f"\033[{k}m{k}: {v}\033[0m" for k, v in ANSI_COLORS.items()], "24-bit colors are also supported.", sep="\n")
-                        elif q in ["au", "cr"]:
-                            GreenPrint(__doc__)
-                        elif viewer_mode:
-                            RedPrint(f"\033[91mUnknown command or insufficient permissions to run: [{q}]\033[0m", exit_after=False)
-                        elif q.startswith("nh"):
-                            GreenPrint("Relaunching sulfur here...")
-                            os.system(f"{executable} -m sulfur {node.GetPath()} {q.removeprefix('nh')}")
-                            exit()
-                        elif q.startswith("n"):
-                            GreenPrint("Relaunching sulfur...")
-                            os.system(f"{executable} -m sulfur {q.removeprefix('n')}")
+                    q2: str = input(f"Type the following to confirm: \033[3m{node.GetName()}\033[0m > ")
+                    if q2 == node.GetName():
+                        node._GetStorage().Reset(node.GetPath()) # NOQA
+                        if q == "reset+q":
+                            GreenPrint("Reset completed. Exiting Sulfur...")
                             exit()
-                        elif q == "xp":
-                            GreenPrint("Export process started.")
-                            def Iterate(p: str) -> None:
-                                for f in Object(p)._GetChildrenPaths(): # NOQA
-                                    f = Object(f)
-                                    if f.GetType() == "Comment":
-                                        continue
-                                    GreenPrint(f"Exporting: {f.GetPath()}")
-                                    shutil.copy(os.path.join(f.GetPath(), "__Content__"), os.path.join(f"{node.GetName()}.export", f"{f.GetName()}.{f.GetType().replace(':', '-').lower()}"))
-                                    Iterate(f.GetPath())
-                            if os.path.exists(f"{node.GetName()}.export"):
-                                RedPrint(f"{node.GetName()}.export already exists! Delete it with the [rmxp] command or move it manually first before making a new export.", exit_after=False)
-                            os.mkdir(f"{node.GetName()}.export")
-                            Iterate(node.GetPath())
-                            GreenPrint(f"Export completed! See results in {node.GetName()}.export")
-                        elif q == "rmxp":
-                            if os.path.exists(f"{node.GetName()}.export"):
-                                shutil.rmtree(f"{node.GetName()}.export", onerror=ForceRemove)
-                                GreenPrint("Current export deleted.")
-                            else:
-                                RedPrint("No export to delete!", exit_after=False)
-                        elif q in ["reset", "reset+q"]:
-                            RedPrint(f"/!\\ Are you sure you want to delete ALL objects in \033[3m{node.GetPath()}\033[0m", exit_after=False)
-                            try:
-                                while True:
-                                    q2: str = input(f"Type the following to confirm: \033[3m{node.GetName()}\033[0m > ")
-                                    if q2 == node.GetName():
-                                        try:
-                                            os.remove(os.path.join(node.GetPath(), "__Content__"))
-                                            os.remove(os.path.join(node.GetPath(), "__Type__"))
-                                            shutil.rmtree(os.path.join(node.GetPath(), "__Children__"), onerror=ForceRemove)
-                                        except FileNotFoundError:
-                                            ...
-                                        if q == "reset+q":
-                                            GreenPrint("Reset completed. Exiting Sulfur...")
-                                            exit()
-                                        GreenPrint("Reset completed. Restarting Sulfur...")
-                                        os.system(f"{executable} -m sulfur {node.GetPath()}")
-                                        exit()
-                                    else:
-                                        raise KeyboardInterrupt
-                            except (KeyboardInterrupt, EOFError):
-                                RedPrint("Operation cancelled.", exit_after=False)
-                        elif q == "pcl":
-                            print("\033[93m[pcl]\033[0m entered pcl command prompt. use commands like desc, enable, disable, enable-all,\ndisable-all, list-enabled, list-disabled or list to navigate your sulfur plugins with pcl.")
-                            GreenPrint("ctrl+c to exit pcl")
-                            while True:
-                                try:
-                                    q4: str = input("\033[93m[pcl]\033[0m [cmd] ")
-                                    q4cmd, *q4args = q4.split(" ")
-                                    try:
-                                        if q4cmd == "enable":
-                                            if q4args[0] in [plugin.name for plugin in Plugin.GetPlugins()]:
-                                                Plugin(q4args[0], q4args[0] in [plugin.name for plugin in Plugin.GetEnabledPlugins()]).Enable()
-                                                print(f"\033[1;93m[pcl]\033[0m restart sulfur using [nh] (or [n]) to apply changes")
-                                            else:
-                                                RedPrint(f"[pcl] error: plugin '{q4args[0]}' is not installed.", exit_after=False)
-                                        elif q4cmd == "disable":
-                                            if q4args[0] in [plugin.name for plugin in Plugin.GetPlugins()]:
-                                                Plugin(q4args[0], q4args[0] in [plugin.name for plugin in Plugin.GetEnabledPlugins()]).Disable()
-                                                print(f"\033[1;93m[pcl]\033[0m restart sulfur using [nh] (or [n]) to apply changes")
-                                            else:
-                                                RedPrint(f"[pcl] error: plugin '{q4args[0]}' is not installed.", exit_after=False)
-                                        elif q4cmd == "enable-all":
-                                            for plugin in Plugin.GetDisabledPlugins():
-                                                plugin.Enable()
-                                            print(f"\033[1;93m[pcl]\033[0m restart sulfur using [nh] (or [n]) to apply changes")
-                                        elif q4cmd == "disable-all":
-                                            for plugin in Plugin.GetEnabledPlugins():
-                                                plugin.Disable()
-                                            print(f"\033[1;93m[pcl]\033[0m restart sulfur using [nh] (or [n]) to apply changes")
-                                        elif q4cmd == "list-enabled":
-                                            print("\033[1;93m[pcl]\033[0m list of enabled plugins:")
-                                            for plugin in Plugin.GetEnabledPlugins():
-                                                print(f"- {GetRandomColor(plugin.name, force=True)}")
-                                        elif q4cmd == "list-disabled":
-                                            print("\033[1;93m[pcl]\033[0m list of disabled plugins:")
-                                            for plugin in Plugin.GetDisabledPlugins():
-                                                print(f"- {GetRandomColor(plugin.name, force=True)}")
-                                        elif q4cmd == "list":
-                                            print("\033[1;93m[pcl]\033[0m list of all installed plugins:")
-                                            for plugin in Plugin.GetPlugins():
-                                                print(f"- {GetRandomColor(plugin.name, force=True)} \033[90m({'enabled' if plugin.enabled else 'disabled'})\033[0m")
-                                        elif q4cmd == "desc":
-                                            if q4args[0] in [plugin.name for plugin in Plugin.GetPlugins()]:
-                                                print(f"\033[90m[pcl] note: the following description was provided by the author of {q4args[0]}.\033[0m")
-                                                GreenPrint(f"\033[3m{Plugin(q4args[0], q4args[0] in [plugin.name for plugin in Plugin.GetEnabledPlugins()]).GetDescription() or '\033[91m[pcl] no description provided.'}\033[0m")
-                                            else:
-                                                RedPrint(f"[pcl] error: plugin '{q4args[0]}' is not installed.", exit_after=False)
-                                        elif q4cmd in ["nh", "n"]:
-                                            RedPrint(f"[pcl] error: command [{q4cmd}] cannot be run in pcl mode, press ctrl-c and try again.", exit_after=False)
-                                        elif not q4:
-                                            ...
-                                        else:
-                                            RedPrint(f"[pcl] error: unknown command: [{q4cmd}]", exit_after=False)
-                                    except IndexError:
-                                        RedPrint(f"[pcl] error: not enough arguments provided. syntax: {q4cmd} <pluginName>", exit_after=False)
-                                except (KeyboardInterrupt, EOFError):
-                                    print()
-                                    break
-                        elif commands.get(q) is not None:
-                            commands[q]()
-                        elif not q:
-                            ...
-                        else:
-                            RedPrint(f"Unknown command: [{q}]", exit_after=False)
-                    if "-r" in argv:
-                        exit(0)
+                        GreenPrint("Reset completed. Restarting Sulfur...")
+                        self.restart = [node.GetPath()]
+                        return
+                    else:
+                        raise KeyboardInterrupt
             except (KeyboardInterrupt, EOFError):
-                ...
-        return order, commands
-    @staticmethod
-    def AddChild(parent: Object, name: str, file_type: str, content: str) -> str | None:
+                RedPrint("Operation cancelled.", exit_after=False, error=False)
+        elif q == "pcl":
+            PCLPrompt()
+        elif q.split(" ")[0] in ["find", "grep"]:
+            self.Search(q)
+        elif q == "reindex":
+            start: float = time.perf_counter()
+            count: int = self.search.Sync(node.GetPath())
+            self.search.Save()
+            GreenPrint(f"Reindexed {count} objects in {time.perf_counter() - start:.2f}s. {self.search.GetStats()['documents']} objects are indexed.")
+        elif q.split(" ")[0] in ["pack", "unpack"]:
+            i: int | None = ParseCharVariant(q.split(" ")[-1])
+            target: Object | None = self._node_index[i][0] if i is not None and i < len(self._node_index) else None
+            if target is None or target.GetType() != "ValueArray":
+                RedPrint(f"Usage: [{q.split(' ')[0]} <order of a ValueArray>], e.g. [{q.split(' ')[0]} 03]", exit_after=False)
+                return
+            count: int = target.GetValueCount()
+            target.Pack() if q.startswith("pack") else target.Unpack()
+            self.lines.Forget(target.GetPath())
+            self.search.Sync(target.GetPath())
+            self.Reload()
+            self.Redraw()
+            GreenPrint(f"{'Packed' if q.startswith('pack') else 'Unpacked'} {count} values of {target.GetName()}.")
+        elif action is not None:
+            action()
+        elif not q:
+            ...
+        else:
+            RedPrint(f"Unknown command: [{q}]", exit_after=False)
+            self._unknown = True
+    def Search(self, q: str) -> None:
+        # [find <name words>] or [grep <words>], optionally narrowed with type:<ObjectType>; a word matches whole tokens, word* their
+        # prefixes, and text with other characters is matched as a substring; hits get order chars after the last frame's
+        command, *words = q.split()
+        type_: str | None = next((word.removeprefix("type:") for word in words if word.startswith("type:")), None)
+        words = [word for word in words if not word.startswith("type:")]
+        if not words and type_ is None:
+            RedPrint(f"Usage: [{command} <words> (type:<ObjectType>)], e.g. [{command} hello], [{command} hel*] or [{command} type:Script]", exit_after=False)
+            return
+        start: float = time.perf_counter()
+        results: list[str] = self.search.Query(words, "n:" if command == "find" else "c:", type_)
+        elapsed: float = time.perf_counter() - start
+        del self._node_index[self._frame_nodes:]
+        for rel_path in results:
+            node: Object = self.tree.Find(Object(self.search.GetPath(rel_path)))
+            indent: int = rel_path.count("/") // 2 + (rel_path != ".")
+            order_char: str = GetCharVariant(len(self._node_index))
+            self._node_index.append((node, indent))
+            name: str = "/".join(rel_path.split("/")[1::2]) or node.GetName()
+            print(f"\033[92m{node.GetType()}\033[0m \033[94m{name}\033[0m" + " " + self._FormatControls(self._NodeControls(node, indent), order_char))
+        self.search.Save()
+        GreenPrint(f"{len(results)} result{'' if len(results) == 1 else 's'} in {elapsed * 1000:.1f}ms.")
+    def Reload(self) -> None:
+        self._LoadCollapsed()
+        self.root = self.tree.Load(self._IsFolded)
+        self._rendered.clear()
+        self._heads.clear()
+        self._controls.clear()
+    def AddChild(self, parent: Object, name: str, file_type: str, content: str) -> str | None:
+        parent = self.tree.Find(parent)
         name = name.strip("/\\ \t")
         name = name if name and "/" not in name and "\\" not in name else file_type.split(":")[-1]
         child_dir = os.path.join(parent.GetPath(), "__Children__", name)
-        if os.path.exists(child_dir):
+        storage: DirectoryStorage | SQLiteStorage = parent._GetStorage() # NOQA
+        if storage.Exists(child_dir):
             RedPrint(f"Object of name '{name}' already exists in that location! Delete it first if you want to overwrite it.", exit_after=False)
             return
-        os.makedirs(child_dir)
-        with open(os.path.join(child_dir, "__Type__"), 'w') as f:
-            f.write(file_type)
-        with open(os.path.join(child_dir, "__Content__"), 'w') as f:
-            f.write(content)
-        os.makedirs(os.path.join(child_dir, "__Children__"))
+        storage.Create(parent.GetPath(), name, file_type, content)
+        self.search.Update(self.tree.Add(parent, child_dir))
+        self.MarkDirty(parent)
         return child_dir
-    @staticmethod
-    def DeleteChild(parent: Object, name: str):
-        child_dir = parent.GetChild(name, _allow_get_comments=True).GetPath()
-        if not os.path.exists(child_dir):
+    def DeleteChild(self, parent: Object, name: str):
+        parent = self.tree.Find(parent)
+        child: Object = parent.GetChild(name, _allow_get_comments=True)
+        child_dir = child.GetPath()
+        if not child._GetStorage().Exists(child_dir): # NOQA
             RedPrint(f"No such object: {name} at {child_dir}", exit_after=False)
             return
-        shutil.rmtree(child_dir, onerror=ForceRemove)
-    @staticmethod
-    def RenameChild(parent: Object, name: str, new_name: str):
-        child_dir = parent.GetChild(name, _allow_get_comments=True).GetPath()
-        if not os.path.exists(child_dir):
+        child._GetStorage().Remove(parent.GetPath(), name) # NOQA
+        self._MoveCollapsed(self._RelPath(child), None)
+        self.lines.Forget(child_dir)
+        self.search.Forget(child_dir)
+        self._ForgetSubtree(child)
+        self.tree.Remove(child)
+        self.MarkDirty(parent)
+    def RenameChild(self, parent: Object, name: str, new_name: str):
+        parent = self.tree.Find(parent)
+        child: Object = parent.GetChild(name, _allow_get_comments=True)
+        child_dir = child.GetPath()
+        if not child._GetStorage().Exists(child_dir): # NOQA
             RedPrint(f"No such object: {name} at {child_dir}", exit_after=False)
             return
         new_name = new_name.strip("/\\ \t")
         new_name = new_name if new_name and "/" not in new_name and "\\" not in new_name else parent.GetChild(name).GetType()
-        os.rename(child_dir, os.path.join(child_dir, "..", new_name))
-    @staticmethod
-    def Write(file: Object, content: str):
-        if not os.path.exists(file.GetPath()):
+        child._GetStorage().Rename(parent.GetPath(), name, new_name) # NOQA
+        old_path: str = self._RelPath(child)
+        self.lines.Forget(child_dir)
+        self._ForgetSubtree(child)
+        self.tree.Rename(child, new_name)
+        self.search.Move(child_dir, child.GetPath())
+        self.search.Update(child)
+        self._MoveCollapsed(old_path, self._RelPath(child))
+        self.MarkDirty(child)
+    def Write(self, file: Object, content: str):
+        storage: DirectoryStorage | SQLiteStorage = file._GetStorage() # NOQA
+        if not storage.Exists(file.GetPath()):
             RedPrint(f"No such object: {file.GetName()} at {file.GetParent().GetPath()}", exit_after=False)
             return
-        with open(os.path.join(file.GetPath(), "__Content__"), 'w') as f:
-            f.write(str(content))
\ No newline at end of file
+        if storage.ReadContent(file.GetPath()) == str(content):
+            return
+        storage.WriteContent(file.GetPath(), str(content))
+        file._SetContent(str(content)) # NOQA
+        node: Object = self.tree.Find(file)
+        if node is not file:
+            node._SetContent(str(content)) # NOQA
+        self.search.Update(node)
+        self.MarkDirty(node)
\ No newline at end of file
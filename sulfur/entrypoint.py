@@ -2,7 +2,8 @@ import os, ctypes, sys
 from sys import argv
 from questionary import select
 
-from .core import ObjectTreeCLUI
+from .core import ObjectTreeCLUI, ReloadPlugins
+from .storage import Open
 from .util import RedPrint, SEP, GreenPrint
 
 ERRORS_TO_QUIT: int = 5
@@ -14,37 +15,48 @@ def IsAdmin() -> bool:
         return False
 
 
-def main() -> None:
-    # if not IsAdmin():
-    #     ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, " ".join(sys.argv), None, 1)
-    #     sys.exit()
+def PrintModes() -> None:
+    if "-j" in argv:
+        return
     if "-v" in argv:
-        RedPrint("Running in -v (verbose) mode", exit_after=False)
+        RedPrint("Running in -v (verbose) mode", exit_after=False, error=False)
     if "-c" in argv:
-        RedPrint("Running in -c (colour) mode", exit_after=False)
+        RedPrint("Running in -c (colour) mode", exit_after=False, error=False)
     if "-e" in argv:
-        RedPrint("Running in -e (eval preview) mode", exit_after=False)
+        RedPrint("Running in -e (eval preview) mode", exit_after=False, error=False)
         print("\033[33mWARNING: This mode executes all ScriptEval objects every time the clui is refreshed. Malicious or broken code may damage or crash sulfur.\033[0m")
     if "-n" in argv:
-        RedPrint("Running in -n (no permissions) mode", exit_after=False)
+        RedPrint("Running in -n (no permissions) mode", exit_after=False, error=False)
         print("\033[33mWARNING: Some commands may not render correctly in -n mode.\033[0m")
-    errors: list[str] = []
+    if "-p" in argv:
+        RedPrint("Running in -p (pager) mode", exit_after=False, error=False)
+
+def OpenWorkspace() -> ObjectTreeCLUI:
     try:
         if argv[1].startswith("-"):
             raise IndexError("This error is raised to make -options not behave like workspace paths.")
-        ft = ObjectTreeCLUI(argv[1])
+        ft = ObjectTreeCLUI(Open(argv[1]))
     except IndexError:
         selection: str = select("Select a location as argument 1:", [i+'/' for i in [
             "."
         ]+os.listdir(".")]).ask()
         if selection is None:
             exit(0)
-        ft = ObjectTreeCLUI(os.path.abspath(selection))
+        ft = ObjectTreeCLUI(Open(selection))
     try:
         ft.InitRoot()
     except FileNotFoundError:
         RedPrint(f"'{argv[1]}' is not a valid Workspace path.")
         exit()
+    return ft
+
+def main() -> None:
+    # if not IsAdmin():
+    #     ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, " ".join(sys.argv), None, 1)
+    #     sys.exit()
+    PrintModes()
+    errors: list[str] = []
+    ft: ObjectTreeCLUI = OpenWorkspace()
     while True:
         try:
             ft.Display(viewer_mode="-n" in argv)
@@ -62,4 +74,10 @@ def main() -> None:
             RedPrint(f"Error: {err}", exit_after=False)
             errors.append(str(err))
             continue
-        break
\ No newline at end of file
+        if ft.restart is None:
+            break
+        argv[1:] = ft.restart
+        ReloadPlugins()
+        PrintModes()
+        errors.clear()
+        ft = OpenWorkspace()
@@ -1,5 +1,6 @@
 import os, yaml, shutil, sys
 from pathlib import Path
+from typing import Any
 from importlib.util import spec_from_file_location, module_from_spec
 
 def PluginError(err: Exception, plugin: "Plugin") -> None:
@@ -38,6 +39,33 @@ def LoadNecessaryResources() -> None:
     LoadResource("sulfur.bat", dir=False, contents="@echo off;;python -m shiv;;pause".replace(";;", "\n"))
 
 PLUGIN_PATH: str = f"{__file__}{SEP}..{SEP}plugins"
+
+class ConfigCache:
+    def __init__(self) -> None:
+        self.entries: dict[str, tuple[int, int, dict]] = {} # {resolved path: (mtime_ns, size, content)}
+        self.hits: int = 0
+        self.misses: int = 0
+    def Get(self, path: str) -> dict:
+        resolved: str = os.path.realpath(path)
+        st: os.stat_result = os.stat(resolved)
+        entry: tuple[int, int, dict] | None = self.entries.get(resolved)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        with open(resolved) as file:
+            content: dict = yaml.safe_load(file)
+        self.entries[resolved] = (st.st_mtime_ns, st.st_size, content)
+        return content
+    def Clear(self) -> None:
+        self.entries.clear()
+    def GetStats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+CONFIG_CACHE: ConfigCache = ConfigCache()
+_traced_object_types: dict[str, str] = {}
+_permission_tables: dict[str, "PermissionTable"] = {} # {plugin path: compiled permissions}
+_included_modules: dict[tuple[str, str, str, str], tuple[int, int, Any]] = {} # {(plugin path, resource, requester, author): (mtime_ns, size, module)}
 def _GetEnabledPluginPaths() -> list[str]:
     LoadNecessaryResources()
     return [f"{PLUGIN_PATH}{SEP}enabled{SEP}{plugin}" for plugin in os.listdir(f"{PLUGIN_PATH}{SEP}enabled")]
@@ -61,6 +89,7 @@ class Plugin:
             from .util import ForceRemove
             shutil.rmtree(self.path, onerror=ForceRemove)
             self.path = new_path
+            GetRegistry().Rebuild()
     def Disable(self) -> None:
         if not self.enabled:
             print(f"\033[1;93m[pcl]\033[0m plugin '{self.name}' already disabled.")
@@ -72,6 +101,7 @@ class Plugin:
             from .util import ForceRemove
             shutil.rmtree(self.path, onerror=ForceRemove)
             self.path = new_path
+            GetRegistry().Rebuild()
     def GetDescription(self) -> str | None:
         pcl_content: dict = self.ReadConfig(f"{self.path}{SEP}.plugin")
         return pcl_content.get("Description")
@@ -85,17 +115,20 @@ class Plugin:
         return cls(name, enabled)
     @classmethod
     def GetEnabledPlugins(cls) -> "list[Plugin]":
-        return [cls.FromPath(plugin) for plugin in _GetEnabledPluginPaths()]
+        return list(GetRegistry().enabled)
     @classmethod
     def GetDisabledPlugins(cls) -> "list[Plugin]":
-        return [cls.FromPath(plugin) for plugin in _GetDisabledPluginPaths()]
+        return list(GetRegistry().disabled)
     @classmethod
     def GetPlugins(cls) -> "list[Plugin]":
         return cls.GetEnabledPlugins() + cls.GetDisabledPlugins()
     @staticmethod
     def TraceObjectType(object_type: str) -> str | None:
         if ":" in object_type:
-            return f"{PLUGIN_PATH}{SEP}{'enabled' if os.path.exists(PLUGIN_PATH+f'{SEP}enabled{SEP}'+object_type.split(':')[0]) else 'disabled'}{SEP}{object_type.split(':')[0]}{SEP}{object_type.split(':')[1]}.objtype"
+            trace: str | None = _traced_object_types.get(object_type)
+            if trace is None:
+                trace = _traced_object_types[object_type] = f"{PLUGIN_PATH}{SEP}{'enabled' if object_type.split(':')[0] in GetRegistry().enabled_names else 'disabled'}{SEP}{object_type.split(':')[0]}{SEP}{object_type.split(':')[1]}.objtype"
+            return trace
     @staticmethod
     def GetAllObjectTypes(plugins: "list[Plugin]") -> list[str]:
         l: list[str] = []
@@ -104,124 +137,238 @@ class Plugin:
         return l
     @classmethod
     def GetExecutableObjectTypes(cls, plugins: "list[Plugin]") -> list[str]:
-        l: list[str] = []
-        for plugin in plugins:
-            for ot in plugin.GetObjectTypes():
-                try:
-                    try:
-                        if (cls.ReadConfig(cls.TraceObjectType(ot))["Execute"] or {}).get("Enabled", False):
-                            l.append(ot)
-                    except TypeError as err:
-                        PluginError(err, Plugin.FromPath(str(Path(cls.TraceObjectType(ot)).parent)))
-                except AttributeError as err:
-                    PluginError(err, plugin)
-        return l
+        registry: PluginRegistry = GetRegistry()
+        return [ot for plugin in plugins for ot in registry.object_types.get(plugin.name, []) if ot in registry.executable_types]
     @staticmethod
     def ReadConfig(path: str) -> dict:
         #ot: str = ':'.join(path.split(SEP)[-2:]).removesuffix('.objtype')
         #if not os.path.exists(path):
         #    from .util import RedPrint
         #    RedPrint(f"[pcl] error: object type '{ot}' could not be fetched. perhaps {ot.split(':')[0]} has been disabled/uninstalled?")
-        with open(path) as file:
-            content: dict = yaml.safe_load(file)
-        return content
+        return CONFIG_CACHE.Get(path)
+    def GetPermissionTable(self) -> "PermissionTable":
+        config: dict = self.ReadConfig(f"{self.path}{SEP}.plugin")
+        table: PermissionTable | None = _permission_tables.get(self.path)
+        if table is None or not table.IsCurrent(config):
+            table = _permission_tables[self.path] = PermissionTable(self.path, config)
+        return table
     def Include(self, filename: str, req_plugin: str, req_author: str):
         if ".py" in filename:
             print(f"\033[33m[pcl] warning: possible (unsupported) file extension found during import of '{self.name}:{filename}'. make sure your file is called i.e. Script, and not Script.py.")
         path: str = f"{self.path}{SEP}{filename.replace('.', SEP)}.py"
-        if not os.path.exists(path):
+        try:
+            st: os.stat_result = os.stat(path)
+        except FileNotFoundError:
             from .util import RedPrint
             RedPrint(f"[pcl] error: '{self.name}:{filename}' file could not be found during import.", exit_after=False)
             return
-        pcl_content: dict = self.ReadConfig(f"{self.path}{SEP}.plugin")
-        matches: list[dict] = [] # {"path": str, "priority": int, "layer": int, "content": dict}
+        denial: str | None = self.GetPermissionTable().Check(filename, req_plugin, req_author)
+        if denial is not None:
+            from .util import RedPrint
+            if denial.startswith("Groups:"):
+                RedPrint(f"[pcl] error: non-existent permission group with key '{denial.removeprefix('Groups:')}'", exit_after=False)
+                return
+            if "-v" in sys.argv:
+                print(f"'{req_plugin} by {req_author}' tried to fetch a private resource." if denial == "Private" else f"'{req_plugin} by {req_author}' failed {denial} check.")
+            RedPrint(f"[pcl] error: no permission to use '{self.name}:{filename}'.", exit_after=False)
+            return
+        key: tuple[str, str, str, str] = (self.path, filename, req_plugin, req_author)
+        entry: tuple[int, int, Any] | None = _included_modules.get(key)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            return entry[2]
+        spec = spec_from_file_location(filename.replace(".", "_"), path)
+        module = module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _included_modules[key] = (st.st_mtime_ns, st.st_size, module)
+        return module
+
+class PermissionTable:
+    # resource -> effective permissions of a .plugin file, resolved with the same selector priorities Include always used
+    CHECKS: tuple[str, ...] = ("PluginWhitelist", "AuthorWhitelist", "PluginBlacklist", "AuthorBlacklist")
+    def __init__(self, path: str, config: dict) -> None:
+        self.path: str = path
+        self.config: dict = config
+        self.watched: dict[str, int] = {} # {directory listed by a wild selector: mtime_ns}
+        self.rules: dict[str, dict[str, tuple[bool, frozenset]] | str] = {} # {resource: {check: (enabled, names)} or missing group}
         # priority rules: 1 - wild selector, 2 - semi-specific wild selector, 3 - specific selector
-        p1l: int = 0
-        p2l: int = 0
-        p3l: int = 0
-        for en, ec in ((pcl_content.get("Permissions") or {}).get("Resources") or {}).items():
+        chosen: dict[str, tuple[int, dict]] = {}
+        def Match(resource: str, priority: int, content: dict) -> None:
+            if resource not in chosen or priority < chosen[resource][0]:
+                chosen[resource] = (priority, content)
+        for en, ec in ((config.get("Permissions") or {}).get("Resources") or {}).items():
             ec = ec or {}
-            if en == filename:
-                matches.append({
-                    "path": en,
-                    "priority": 3,
-                    "layer": p3l,
-                    "content": ec
-                })
-                p3l += 1
-                continue
+            Match(en, 3, ec)
             if en == ".*":
-                matches += [{
-                    "path": p,
-                    "priority": 1,
-                    "layer": p1l,
-                    "content": ec
-                } for p in os.listdir(self.path)]
-                p1l += 1
+                for p in self._List(path):
+                    Match(p, 1, ec)
                 continue
             current: list[str] = []
             for section in en.split("."):
                 if section.strip() == "*":
-                    matches += [{
-                        "path": f"{'.'.join(current)}.{p}",
-                        "priority": 1,
-                        "layer": p2l,
-                        "content": ec
-                    } for p in os.listdir(f"{self.path}{SEP}{'.'.join(current).replace('.', SEP)}")]
-                    p2l += 1
+                    for p in self._List(f"{path}{SEP}{'.'.join(current).replace('.', SEP)}"):
+                        Match(f"{'.'.join(current)}.{p}", 1, ec)
                     break
                 else:
                     current.append(section)
-        p1m: list[dict] = [match for match in matches if match["priority"] == 1 and match["path"] == filename]
-        p2m: list[dict] = [match for match in matches if match["priority"] == 2 and match["path"] == filename]
-        p3m: list[dict] = [match for match in matches if match["priority"] == 3 and match["path"] == filename]
-        ep: list | None = p1m if p1m else (p2m if p2m else (p3m if p3m else None))
-        def PrintNoPermission() -> None:
-            from .util import RedPrint
-            RedPrint(f"[pcl] error: no permission to use '{self.name}:{filename}'.", exit_after=False)
-        if ep is None:
-            if "-v" in sys.argv:
-                print(f"'{req_plugin} by {req_author}' tried to fetch a private resource.")
-            PrintNoPermission()
-            return
-        em: dict = ep[0]
-        permissions: dict = em["content"]
-        if permissions.get("InheritsFrom"):
-            inherited: dict | None | str = ((pcl_content.get("Permissions") or {}).get("Groups") or {}).get(permissions["InheritsFrom"], "NON-EXISTENT") or {}
-            if inherited == "NON-EXISTENT":
-                from .util import RedPrint
-                RedPrint(f"[pcl] error: non-existent permission group with key '{permissions.get('InheritsFrom')}'", exit_after=False)
-                return
-            permissions = permissions | inherited
-        pwe: bool = (permissions.get("PluginWhitelist") or {}).get("Enabled") or False
-        pw: list[str] = (permissions.get("PluginWhitelist") or {}).get("List") or []
-        awe: bool = (permissions.get("AuthorWhitelist") or {}).get("Enabled") or False
-        aw: list[str] = (permissions.get("AuthorWhitelist") or {}).get("List") or []
-        pbe: bool = (permissions.get("PluginBlacklist") or {}).get("Enabled") or False
-        pb: list[str] = (permissions.get("PluginBlacklist") or {}).get("List") or []
-        abe: bool = (permissions.get("AuthorBlacklist") or {}).get("Enabled") or False
-        ab: list[str] = (permissions.get("AuthorBlacklist") or {}).get("List") or []
-        if pwe and (req_plugin not in pw):
-            if "-v" in sys.argv:
-                print(f"'{req_plugin} by {req_author}' failed PluginWhitelist check.")
-            PrintNoPermission()
-            return
-        if awe and (req_author not in aw):
-            if "-v" in sys.argv:
-                print(f"'{req_plugin} by {req_author}' failed AuthorWhitelist check.")
-            PrintNoPermission()
-            return
-        if pbe and (req_plugin in pb):
-            if "-v" in sys.argv:
-                print(f"'{req_plugin} by {req_author}' failed PluginBlacklist check.")
-            PrintNoPermission()
-            return
-        if abe and (req_author in ab):
-            if "-v" in sys.argv:
-                print(f"'{req_plugin} by {req_author}' failed AuthorBlacklist check.")
-            PrintNoPermission()
-            return
-        spec = spec_from_file_location(filename.replace(".", "_"), path)
-        module = module_from_spec(spec)
-        spec.loader.exec_module(module)
-        return module
\ No newline at end of file
+        groups: dict = (config.get("Permissions") or {}).get("Groups") or {}
+        for resource, (_, permissions) in chosen.items():
+            if permissions.get("InheritsFrom"):
+                inherited: dict | None | str = groups.get(permissions["InheritsFrom"], "NON-EXISTENT") or {}
+                if inherited == "NON-EXISTENT":
+                    self.rules[resource] = permissions["InheritsFrom"]
+                    continue
+                permissions = permissions | inherited
+            self.rules[resource] = {check: ((permissions.get(check) or {}).get("Enabled") or False, frozenset((permissions.get(check) or {}).get("List") or [])) for check in self.CHECKS}
+    def _List(self, directory: str) -> list[str]:
+        self.watched[directory] = os.stat(directory).st_mtime_ns
+        return os.listdir(directory)
+    def IsCurrent(self, config: dict) -> bool:
+        if config is not self.config:
+            return False
+        try:
+            return all(os.stat(directory).st_mtime_ns == mtime for directory, mtime in self.watched.items())
+        except FileNotFoundError:
+            return False
+    def Check(self, resource: str, req_plugin: str, req_author: str) -> str | None:
+        # returns None when access is granted, otherwise why it was denied
+        rule: dict[str, tuple[bool, frozenset]] | str | None = self.rules.get(resource)
+        if rule is None:
+            return "Private"
+        if isinstance(rule, str):
+            return f"Groups:{rule}"
+        for check in self.CHECKS:
+            enabled, names = rule[check]
+            requester: str = req_plugin if check.startswith("Plugin") else req_author
+            if enabled and (requester in names) != check.endswith("Whitelist"):
+                return check
+        return None
+
+class PluginRegistry:
+    def __init__(self) -> None:
+        self.enabled: list[Plugin] = []
+        self.disabled: list[Plugin] = []
+        self.enabled_names: set[str] = set()
+        self.object_types: dict[str, list[str]] = {} # {plugin name: [object types]}
+        self.plugin_configs: dict[str, dict] = {} # {plugin name: parsed .plugin}
+        self.executable_types: set[str] = set()
+        self.editable_types: set[str] = set()
+        self.built: bool = False
+        self.generation: int = 0
+    def Rebuild(self) -> None:
+        LoadNecessaryResources()
+        _traced_object_types.clear()
+        _permission_tables.clear()
+        _included_modules.clear()
+        self.generation += 1
+        self.enabled = [Plugin.FromPath(path) for path in _GetEnabledPluginPaths()]
+        self.disabled = [Plugin.FromPath(path) for path in _GetDisabledPluginPaths()]
+        self.enabled_names = {plugin.name for plugin in self.enabled}
+        self.object_types = {}
+        self.plugin_configs = {}
+        self.executable_types = set()
+        self.editable_types = set()
+        self.built = True
+        for plugin in self.enabled + self.disabled:
+            self.object_types[plugin.name] = plugin.GetObjectTypes()
+            try:
+                self.plugin_configs[plugin.name] = Plugin.ReadConfig(f"{plugin.path}{SEP}.plugin") or {}
+            except FileNotFoundError:
+                self.plugin_configs[plugin.name] = {}
+            for ot in self.object_types[plugin.name]:
+                config: dict = self.GetConfig(ot)
+                if not plugin.enabled:
+                    continue
+                try:
+                    try:
+                        if (config["Execute"] or {}).get("Enabled", False):
+                            self.executable_types.add(ot)
+                        if (config["Editor"] or {}).get("Enabled", True):
+                            self.editable_types.add(ot)
+                    except TypeError as err:
+                        PluginError(err, Plugin.FromPath(str(Path(Plugin.TraceObjectType(ot)).parent)))
+                except AttributeError as err:
+                    PluginError(err, plugin)
+    def GetConfig(self, object_type: str) -> dict:
+        # goes through CONFIG_CACHE on every call, so an edited .objtype is picked up without a rebuild
+        return Plugin.ReadConfig(Plugin.TraceObjectType(object_type))
+    def GetObjectTypes(self, enabled_only: bool = True) -> list[str]:
+        return [ot for plugin in (self.enabled if enabled_only else self.enabled + self.disabled) for ot in self.object_types[plugin.name]]
+
+REGISTRY: PluginRegistry = PluginRegistry()
+def GetRegistry() -> PluginRegistry:
+    if not REGISTRY.built:
+        REGISTRY.Rebuild()
+    return REGISTRY
+
+def _FindPlugin(name: str) -> "Plugin | None":
+    if name in [plugin.name for plugin in Plugin.GetPlugins()]:
+        return Plugin(name, name in GetRegistry().enabled_names)
+    return None
+
+def EnablePlugin(name: str) -> bool:
+    plugin: Plugin | None = _FindPlugin(name)
+    if plugin is not None:
+        plugin.Enable()
+    return plugin is not None
+
+def DisablePlugin(name: str) -> bool:
+    plugin: Plugin | None = _FindPlugin(name)
+    if plugin is not None:
+        plugin.Disable()
+    return plugin is not None
+
+def RunPCLCommand(q: str) -> None:
+    from .util import RedPrint, GreenPrint, GetRandomColor
+    cmd, *args = q.split(" ")
+    try:
+        if cmd in ["enable", "disable"]:
+            if (EnablePlugin if cmd == "enable" else DisablePlugin)(args[0]):
+                print(f"\033[1;93m[pcl]\033[0m restart sulfur using [nh] (or [n]) to apply changes")
+            else:
+                RedPrint(f"[pcl] error: plugin '{args[0]}' is not installed.", exit_after=False)
+        elif cmd == "enable-all":
+            for plugin in Plugin.GetDisabledPlugins():
+                plugin.Enable()
+            print(f"\033[1;93m[pcl]\033[0m restart sulfur using [nh] (or [n]) to apply changes")
+        elif cmd == "disable-all":
+            for plugin in Plugin.GetEnabledPlugins():
+                plugin.Disable()
+            print(f"\033[1;93m[pcl]\033[0m restart sulfur using [nh] (or [n]) to apply changes")
+        elif cmd == "list-enabled":
+            print("\033[1;93m[pcl]\033[0m list of enabled plugins:")
+            for plugin in Plugin.GetEnabledPlugins():
+                print(f"- {GetRandomColor(plugin.name, force=True)}")
+        elif cmd == "list-disabled":
+            print("\033[1;93m[pcl]\033[0m list of disabled plugins:")
+            for plugin in Plugin.GetDisabledPlugins():
+                print(f"- {GetRandomColor(plugin.name, force=True)}")
+        elif cmd == "list":
+            print("\033[1;93m[pcl]\033[0m list of all installed plugins:")
+            for plugin in Plugin.GetPlugins():
+                print(f"- {GetRandomColor(plugin.name, force=True)} \033[90m({'enabled' if plugin.enabled else 'disabled'})\033[0m")
+        elif cmd == "desc":
+            plugin: Plugin | None = _FindPlugin(args[0])
+            if plugin is not None:
+                print(f"\033[90m[pcl] note: the following description was provided by the author of {args[0]}.\033[0m")
+                GreenPrint(f"\033[3m{plugin.GetDescription() or '\033[91m[pcl] no description provided.'}\033[0m")
+            else:
+                RedPrint(f"[pcl] error: plugin '{args[0]}' is not installed.", exit_after=False)
+        elif cmd in ["nh", "n"]:
+            RedPrint(f"[pcl] error: command [{cmd}] cannot be run in pcl mode, press ctrl-c and try again.", exit_after=False)
+        elif not q:
+            ...
+        else:
+            RedPrint(f"[pcl] error: unknown command: [{cmd}]", exit_after=False)
+    except IndexError:
+        RedPrint(f"[pcl] error: not enough arguments provided. syntax: {cmd} <pluginName>", exit_after=False)
+
+def PCLPrompt() -> None:
+    from .util import GreenPrint
+    print("\033[93m[pcl]\033[0m entered pcl command prompt. use commands like desc, enable, disable, enable-all,\ndisable-all, list-enabled, list-disabled or list to navigate your sulfur plugins with pcl.")
+    GreenPrint("ctrl+c to exit pcl")
+    while True:
+        try:
+            RunPCLCommand(input("\033[93m[pcl]\033[0m [cmd] "))
+        except (KeyboardInterrupt, EOFError):
+            print()
+            break
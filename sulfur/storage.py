@@ -0,0 +1,587 @@
+import os, json, hashlib, shutil, sqlite3, tempfile, threading, time, sys
+from array import array
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, NamedTuple
+
+SQLITE_SUFFIXES: list[str] = [".db", ".sqlite", ".sqlite3"]
+_SQLITE_HEADER: bytes = b"SQLite format 3\0"
+
+def _CreationTime(path: str, st: os.stat_result) -> float:
+    # st_ctime is the creation time only on Windows; elsewhere it moves whenever a file such as __Order__ is added,
+    # so the ctime of __Type__, which is written once when the object is created, is used instead
+    if os.name == "nt":
+        return st.st_ctime
+    birthtime: float | None = getattr(st, "st_birthtime", None)
+    if birthtime is not None:
+        return birthtime
+    try:
+        return os.stat(os.path.join(path, "__Type__")).st_ctime
+    except FileNotFoundError:
+        return st.st_ctime
+def _OrderChildren(names: list[str], order: list[str] | None, ctime: Callable[[str], float]) -> list[str]:
+    if order is None:
+        return sorted(names, key=ctime)
+    # the manifest wins; children created outside of sulfur are appended in ctime order
+    present: set[str] = set(names)
+    ordered: list[str] = [name for name in order if name in present]
+    if len(ordered) != len(names):
+        listed: set[str] = set(ordered)
+        ordered += sorted([name for name in names if name not in listed], key=ctime)
+    return ordered
+
+_CACHE_HOME: str = (os.environ.get("LOCALAPPDATA") if os.name == "nt" else os.environ.get("XDG_CACHE_HOME")) or os.path.join(os.path.expanduser("~"), ".cache")
+
+def _BytecodeStore(root: str) -> str:
+    # compiled code is cached per user rather than inside the workspace, so a shared or copied workspace cannot bring
+    # bytecode that differs from its visible source
+    return os.path.join(_CACHE_HOME, "sulfur", "bytecode", hashlib.sha256(os.path.abspath(root).encode(errors="surrogatepass")).hexdigest()[:32])
+
+class DirectoryStorage:
+    # the original layout: one directory per object holding __Type__, __Content__, __Order__ and __Children__/
+    def Init(self, root: str, object_type: str = "Workspace", content: str = "") -> None:
+        with open(os.path.join(root, "__Content__"), "w") as file:
+            file.write(content)
+        with open(os.path.join(root, "__Type__"), "w") as file:
+            file.write(object_type)
+        os.makedirs(os.path.join(root, "__Children__"), exist_ok=True)
+    def Exists(self, path: str) -> bool:
+        return os.path.exists(path)
+    def ReadType(self, path: str) -> str | None:
+        try:
+            with open(os.path.join(path, "__Type__")) as file:
+                return file.read().strip()
+        except FileNotFoundError:
+            return None
+    def ReadContent(self, path: str, limit: int | None = None) -> str | None:
+        try:
+            with open(os.path.join(path, "__Content__")) as file:
+                return file.read() if limit is None else file.read(limit)
+        except FileNotFoundError:
+            return None
+    def WriteContent(self, path: str, content: str) -> None:
+        with open(os.path.join(path, "__Content__"), "w") as file:
+            file.write(content)
+    def Stat(self, path: str, filename: str, entries: dict[str, Any] | None = None) -> os.stat_result:
+        entry: os.DirEntry | None = (entries or {}).get(filename)
+        if entry is not None:
+            return entry.stat()
+        return os.stat(os.path.join(path, filename))
+    def Scan(self, path: str, children: bool = True) -> tuple[str | None, list[str], dict[str, Any]]:
+        # (type, ordered child names, stat cache for Stat)
+        try:
+            with os.scandir(path) as it:
+                entries: dict[str, os.DirEntry] = {entry.name: entry for entry in it}
+        except FileNotFoundError:
+            entries = {}
+        object_type: str | None = None
+        if "__Type__" in entries:
+            with open(entries["__Type__"].path) as file:
+                object_type = file.read().strip()
+        if not children or "__Children__" not in entries:
+            return object_type, [], entries
+        return object_type, self._ChildNames(entries["__Children__"].path, self.ReadOrder(path) if "__Order__" in entries else None), entries
+    def _ChildNames(self, children_dir: str, order: list[str] | None) -> list[str]:
+        try:
+            with os.scandir(children_dir) as it:
+                children: dict[str, os.DirEntry] = {entry.name: entry for entry in it if entry.is_dir()}
+        except FileNotFoundError:
+            return []
+        return _OrderChildren(list(children), order, lambda name: _CreationTime(children[name].path, children[name].stat()))
+    def ChildNames(self, path: str) -> list[str]:
+        return self._ChildNames(os.path.join(path, "__Children__"), self.ReadOrder(path))
+    def ReadOrder(self, path: str) -> list[str] | None:
+        try:
+            with open(os.path.join(path, "__Order__")) as file:
+                return [name for name in file.read().split("\n") if name]
+        except FileNotFoundError:
+            return None
+    def WriteOrder(self, path: str, names: list[str]) -> None:
+        with open(os.path.join(path, "__Order__"), "w") as file:
+            file.write("".join(name + "\n" for name in names))
+    def Create(self, parent: str, name: str, object_type: str, content: str, ordered: bool = True) -> str:
+        # ordered=False leaves __Order__ alone, for callers that write the order of a whole batch themselves
+        child: str = os.path.join(parent, "__Children__", name)
+        order_path: str = os.path.join(parent, "__Order__")
+        order: list[str] | None = None if not ordered or os.path.exists(order_path) else self.ChildNames(parent)
+        os.makedirs(os.path.join(child, "__Children__"))
+        with open(os.path.join(child, "__Type__"), "w") as file:
+            file.write(object_type)
+        with open(os.path.join(child, "__Content__"), "w") as file:
+            file.write(content)
+        if not ordered:
+            return child
+        if order is None:
+            with open(order_path, "a") as file:
+                file.write(name + "\n")
+        else:
+            self.WriteOrder(parent, order + [name])
+        return child
+    def CreateMany(self, objects: list[tuple[str, str, str | None, str | None]], workers: int = 1) -> None:
+        # [(path, name, type, content)] in pre-order: every directory first, then the files on a thread pool
+        for path, _, _, _ in objects:
+            os.makedirs(os.path.join(path, "__Children__"), exist_ok=True)
+        files: list[tuple[str, str]] = [(os.path.join(path, filename), data) for path, _, object_type, content in objects for filename, data in [("__Type__", object_type), ("__Content__", content)] if data is not None]
+        def WriteFile(item: tuple[str, str]) -> None:
+            with open(item[0], "w") as file:
+                file.write(item[1])
+        if workers > 1 and len(files) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(WriteFile, files))
+        else:
+            for item in files:
+                WriteFile(item)
+    def Remove(self, parent: str, name: str) -> None:
+        self.RemoveMany(parent, [name])
+    def RemoveMany(self, parent: str, names: list[str]) -> None:
+        from .util import ForceRemove
+        order: list[str] = self.ChildNames(parent)
+        for name in names:
+            shutil.rmtree(os.path.join(parent, "__Children__", name), onerror=ForceRemove)
+        removed: set[str] = set(names)
+        self.WriteOrder(parent, [n for n in order if n not in removed])
+    def Rename(self, parent: str, name: str, new_name: str) -> None:
+        order: list[str] = self.ChildNames(parent)
+        os.rename(os.path.join(parent, "__Children__", name), os.path.join(parent, "__Children__", new_name))
+        self.WriteOrder(parent, [new_name if n == name else n for n in order])
+    def ReadMeta(self, path: str, key: str) -> str | None:
+        try:
+            with open(os.path.join(path, key)) as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+    def WriteMeta(self, path: str, key: str, value: str | None) -> None:
+        # None removes the entry
+        if value is None:
+            if os.path.exists(os.path.join(path, key)):
+                os.remove(os.path.join(path, key))
+            return
+        with open(os.path.join(path, key), "w") as file:
+            file.write(value)
+    def AppendMeta(self, path: str, key: str, value: str) -> None:
+        with open(os.path.join(path, key), "a") as file:
+            file.write(value)
+    def IsPacked(self, path: str) -> bool:
+        return os.path.exists(os.path.join(path, "__Offsets__"))
+    def CountPacked(self, path: str) -> int:
+        try:
+            return os.path.getsize(os.path.join(path, "__Offsets__")) // 8
+        except FileNotFoundError:
+            return 0
+    def ReadPacked(self, path: str, start: int, stop: int) -> list[str]:
+        # __Offsets__ holds the little-endian uint64 end offset of every value in __Values__, so a slice costs two seeks
+        with open(os.path.join(path, "__Offsets__"), "rb") as file:
+            start, stop, _ = slice(start, stop).indices(os.fstat(file.fileno()).st_size // 8)
+            if start >= stop:
+                return []
+            file.seek((start - 1) * 8 if start else 0)
+            ends: array = array("Q", file.read((stop - start + (1 if start else 0)) * 8))
+        if sys.byteorder == "big":
+            ends.byteswap()
+        bounds: list[int] = ([] if start else [0]) + ends.tolist()
+        with open(os.path.join(path, "__Values__"), "rb") as file:
+            file.seek(bounds[0])
+            data: bytes = file.read(bounds[-1] - bounds[0])
+        return [data[a - bounds[0]:b - bounds[0]].decode() for a, b in zip(bounds, bounds[1:])]
+    def AppendPacked(self, path: str, values: list[str]) -> None:
+        encoded: list[bytes] = [value.encode() for value in values]
+        with open(os.path.join(path, "__Values__"), "ab") as file:
+            end: int = os.fstat(file.fileno()).st_size
+            file.write(b"".join(encoded))
+        ends: array = array("Q")
+        for data in encoded:
+            end += len(data)
+            ends.append(end)
+        if sys.byteorder == "big":
+            ends.byteswap()
+        # the offsets are written last, so an interrupted append never exposes a half-written value
+        with open(os.path.join(path, "__Offsets__"), "ab") as file:
+            file.write(ends.tobytes())
+    def WritePacked(self, path: str, values: list[str] | None) -> None:
+        # None drops the packed representation
+        for filename in ["__Offsets__", "__Values__"]:
+            if os.path.exists(os.path.join(path, filename)):
+                os.remove(os.path.join(path, filename))
+        if values is not None:
+            self.AppendPacked(path, values)
+    def GetBytecodeStore(self, root: str) -> str | None: # NOQA
+        return _BytecodeStore(root)
+    @contextmanager
+    def Checkout(self, path: str) -> Iterator[str]:
+        # a real directory holding __Type__ and __Content__ for tools that work on files, such as the editor
+        yield path
+    def Reset(self, root: str) -> None:
+        from .util import ForceRemove
+        try:
+            os.remove(os.path.join(root, "__Content__"))
+            os.remove(os.path.join(root, "__Type__"))
+            for manifest in ["__Order__", "__Collapsed__", "__Cache__", "__Search__"]:
+                self.WriteMeta(root, manifest, None)
+            for store in [_BytecodeStore(root), os.path.join(root, "__Bytecode__")]: # the second is left by older versions
+                if os.path.exists(store):
+                    shutil.rmtree(store, onerror=ForceRemove)
+            shutil.rmtree(os.path.join(root, "__Children__"), onerror=ForceRemove)
+        except FileNotFoundError:
+            ...
+
+class SQLiteStat(NamedTuple):
+    # the parts of os.stat_result that callers compare; stat() lets it stand in for an os.DirEntry
+    st_mtime_ns: int
+    st_size: int
+    @property
+    def st_mtime(self) -> float:
+        return self.st_mtime_ns / 1e9
+    def stat(self) -> "SQLiteStat":
+        return self
+
+class SQLiteStorage:
+    # a whole workspace in one file; object paths keep the directory layout (<file>/__Children__/<name>/...) but are virtual
+    ROOT_ID: int = 1
+    def __init__(self, file: str):
+        self.root: str = os.path.abspath(file)
+        self.lock: threading.RLock = threading.RLock() # one connection is shared across threads; the lock also keeps the ids cache and multi-statement writes consistent
+        self.ids: dict[str, int] = {self.root: self.ROOT_ID}
+        self.db: sqlite3.Connection = sqlite3.connect(self.root, isolation_level=None, check_same_thread=False)
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA foreign_keys = ON;
+            CREATE TABLE IF NOT EXISTS objects (
+                id INTEGER PRIMARY KEY,
+                parent INTEGER REFERENCES objects(id) ON DELETE CASCADE,
+                name TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                type TEXT,
+                content TEXT,
+                type_mtime_ns INTEGER NOT NULL,
+                content_mtime_ns INTEGER NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS objects_parent_name ON objects(parent, name);
+            CREATE INDEX IF NOT EXISTS objects_parent_position ON objects(parent, position);
+            CREATE TABLE IF NOT EXISTS meta (
+                object INTEGER NOT NULL REFERENCES objects(id) ON DELETE CASCADE,
+                key TEXT NOT NULL,
+                value TEXT,
+                PRIMARY KEY (object, key)
+            );
+            CREATE TABLE IF NOT EXISTS meta_log (
+                object INTEGER NOT NULL REFERENCES objects(id) ON DELETE CASCADE,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS meta_log_object_key ON meta_log(object, key);
+            CREATE TABLE IF NOT EXISTS packed (
+                object INTEGER NOT NULL REFERENCES objects(id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (object, position)
+            ) WITHOUT ROWID;
+        """)
+        # the root row exists from the start; its type stays NULL until Init, like a directory without __Type__
+        self.db.execute("INSERT OR IGNORE INTO objects VALUES (?, NULL, '', 0, NULL, NULL, 0, 0)", (self.ROOT_ID,))
+    def _Id(self, path: str) -> int | None:
+        object_id: int | None = self.ids.get(path)
+        if object_id is not None:
+            return object_id
+        parts: list[str] = os.path.relpath(path, self.root).split(os.sep)
+        if len(parts) % 2 or any(part != "__Children__" for part in parts[::2]):
+            return None
+        current: str = self.root
+        object_id = self.ROOT_ID
+        for name in parts[1::2]:
+            current = os.path.join(current, "__Children__", name)
+            cached: int | None = self.ids.get(current)
+            if cached is None:
+                row: tuple | None = self.db.execute("SELECT id FROM objects WHERE parent = ? AND name = ?", (object_id, name)).fetchone()
+                if row is None:
+                    return None
+                cached = self.ids[current] = row[0]
+            object_id = cached
+        return object_id
+    def _Require(self, path: str) -> int:
+        object_id: int | None = self._Id(path)
+        if object_id is None:
+            raise FileNotFoundError(f"No such object: {path}")
+        return object_id
+    def _Forget(self, path: str) -> None:
+        self.ids = {p: i for p, i in self.ids.items() if not (p == path or p.startswith(path + os.sep))}
+    def Init(self, root: str, object_type: str = "Workspace", content: str = "") -> None:
+        with self.lock:
+            now: int = time.time_ns()
+            self.db.execute("INSERT INTO objects VALUES (?, NULL, '', 0, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET type = excluded.type, content = excluded.content, type_mtime_ns = CASE WHEN objects.type IS excluded.type THEN objects.type_mtime_ns ELSE excluded.type_mtime_ns END, content_mtime_ns = CASE WHEN objects.content IS excluded.content THEN objects.content_mtime_ns ELSE excluded.content_mtime_ns END", (self.ROOT_ID, object_type, content, now, now))
+    def Exists(self, path: str) -> bool:
+        with self.lock:
+            return self._Id(path) is not None
+    def ReadType(self, path: str) -> str | None:
+        with self.lock:
+            object_id: int | None = self._Id(path)
+            row: tuple | None = None if object_id is None else self.db.execute("SELECT type FROM objects WHERE id = ?", (object_id,)).fetchone()
+        return None if row is None else row[0]
+    def ReadContent(self, path: str, limit: int | None = None) -> str | None:
+        with self.lock:
+            object_id: int | None = self._Id(path)
+            if object_id is None:
+                return None
+            if limit is None:
+                row: tuple | None = self.db.execute("SELECT content FROM objects WHERE id = ?", (object_id,)).fetchone()
+            else:
+                row = self.db.execute("SELECT substr(content, 1, ?) FROM objects WHERE id = ?", (limit, object_id)).fetchone()
+        return None if row is None else row[0]
+    def WriteContent(self, path: str, content: str) -> None:
+        with self.lock:
+            # the mtime always moves forward, so caches keyed on it notice two writes within one clock tick
+            self.db.execute("UPDATE objects SET content = ?, content_mtime_ns = max(?, content_mtime_ns + 1) WHERE id = ?", (content, time.time_ns(), self._Require(path)))
+    def Stat(self, path: str, filename: str, entries: dict[str, Any] | None = None) -> SQLiteStat:
+        st: SQLiteStat | None = (entries or {}).get(filename)
+        if st is None:
+            st = self.Scan(path, children=False)[2].get(filename)
+        if st is None:
+            raise FileNotFoundError(f"No such file: {os.path.join(path, filename)}")
+        return st
+    def Scan(self, path: str, children: bool = True) -> tuple[str | None, list[str], dict[str, Any]]:
+        with self.lock:
+            object_id: int | None = self._Id(path)
+            row: tuple | None = None if object_id is None else self.db.execute("SELECT type, type_mtime_ns, length(type), content_mtime_ns, length(content) FROM objects WHERE id = ?", (object_id,)).fetchone()
+            if row is None:
+                return None, [], {}
+            entries: dict[str, SQLiteStat] = {"__Type__": SQLiteStat(row[1], row[2] or 0)}
+            if row[4] is not None:
+                entries["__Content__"] = SQLiteStat(row[3], row[4])
+            return row[0], self.ChildNames(path) if children else [], entries
+    def ChildNames(self, path: str) -> list[str]:
+        with self.lock:
+            object_id: int | None = self._Id(path)
+            if object_id is None:
+                return []
+            return [row[0] for row in self.db.execute("SELECT name FROM objects WHERE parent = ? ORDER BY position, id", (object_id,))]
+    def ReadOrder(self, path: str) -> list[str] | None:
+        return self.ChildNames(path)
+    def WriteOrder(self, path: str, names: list[str]) -> None:
+        with self.lock:
+            object_id: int = self._Require(path)
+            self.db.execute("BEGIN")
+            try:
+                self.db.executemany("UPDATE objects SET position = ? WHERE parent = ? AND name = ?", [(i, object_id, name) for i, name in enumerate(names)])
+            finally:
+                self.db.execute("COMMIT")
+    def _Insert(self, parent: str, name: str, object_type: str | None, content: str | None) -> str:
+        parent_id: int = self._Require(parent)
+        now: int = time.time_ns()
+        cursor: sqlite3.Cursor = self.db.execute("INSERT INTO objects (parent, name, position, type, content, type_mtime_ns, content_mtime_ns) VALUES (?, ?, (SELECT coalesce(max(position) + 1, 0) FROM objects WHERE parent = ?), ?, ?, ?, ?)", (parent_id, name, parent_id, object_type, content, now, now))
+        child: str = os.path.join(parent, "__Children__", name)
+        self.ids[child] = cursor.lastrowid
+        return child
+    def Create(self, parent: str, name: str, object_type: str, content: str, ordered: bool = True) -> str: # NOQA
+        # new objects always go last; the position column is the order
+        with self.lock:
+            try:
+                return self._Insert(parent, name, object_type, content)
+            except sqlite3.IntegrityError:
+                raise FileExistsError(f"Object already exists: {os.path.join(parent, '__Children__', name)}")
+    def CreateMany(self, objects: list[tuple[str, str, str | None, str | None]], workers: int = 1) -> None: # NOQA
+        # one transaction per batch
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                for path, name, object_type, content in objects:
+                    if path == self.root:
+                        self.Init(path, object_type or "Workspace", content or "")
+                    else:
+                        self._Insert(os.path.dirname(os.path.dirname(path)), name, object_type, content)
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                self.ids = {self.root: self.ROOT_ID}
+                raise
+            self.db.execute("COMMIT")
+    def Remove(self, parent: str, name: str) -> None:
+        self.RemoveMany(parent, [name])
+    def RemoveMany(self, parent: str, names: list[str]) -> None:
+        with self.lock:
+            parent_id: int = self._Require(parent)
+            self.db.execute("BEGIN")
+            try:
+                self.db.executemany("DELETE FROM objects WHERE parent = ? AND name = ?", [(parent_id, name) for name in names])
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+            for name in names:
+                self._Forget(os.path.join(parent, "__Children__", name))
+    def Rename(self, parent: str, name: str, new_name: str) -> None:
+        path: str = os.path.join(parent, "__Children__", name)
+        with self.lock:
+            try:
+                self.db.execute("UPDATE objects SET name = ? WHERE id = ?", (new_name, self._Require(path)))
+            except sqlite3.IntegrityError:
+                raise FileExistsError(f"Object already exists: {os.path.join(parent, '__Children__', new_name)}")
+            self._Forget(path)
+    def ReadMeta(self, path: str, key: str) -> str | None:
+        # the value is the meta row followed by whatever AppendMeta added since it was written
+        with self.lock:
+            object_id: int | None = self._Id(path)
+            if object_id is None:
+                return None
+            row: tuple | None = self.db.execute("SELECT value FROM meta WHERE object = ? AND key = ?", (object_id, key)).fetchone()
+            appended: list[str] = [log[0] for log in self.db.execute("SELECT value FROM meta_log WHERE object = ? AND key = ? ORDER BY rowid", (object_id, key))]
+        if row is None and not appended:
+            return None
+        return (row[0] if row is not None else "") + "".join(appended)
+    def WriteMeta(self, path: str, key: str, value: str | None) -> None:
+        with self.lock:
+            object_id: int = self._Require(path)
+            self.db.execute("BEGIN")
+            try:
+                self._WriteMeta(object_id, key, value)
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+    def _WriteMeta(self, object_id: int, key: str, value: str | None) -> None:
+        # the caller holds the lock and the transaction
+        self.db.execute("DELETE FROM meta_log WHERE object = ? AND key = ?", (object_id, key))
+        if value is None:
+            self.db.execute("DELETE FROM meta WHERE object = ? AND key = ?", (object_id, key))
+        else:
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?, ?)", (object_id, key, value))
+    def AppendMeta(self, path: str, key: str, value: str) -> None:
+        # a row per append, so the cost does not grow with the value already stored
+        with self.lock:
+            self.db.execute("INSERT INTO meta_log VALUES (?, ?, ?)", (self._Require(path), key, value))
+    def IsPacked(self, path: str) -> bool:
+        return self.ReadMeta(path, "__Packed__") is not None
+    def CountPacked(self, path: str) -> int:
+        # the length is kept in meta, so it does not need a scan of the packed table
+        return int(self.ReadMeta(path, "__Packed__") or 0)
+    def ReadPacked(self, path: str, start: int, stop: int) -> list[str]:
+        with self.lock:
+            start, stop, _ = slice(start, stop).indices(self.CountPacked(path))
+            return [row[0] for row in self.db.execute("SELECT value FROM packed WHERE object = ? AND position >= ? AND position < ? ORDER BY position", (self._Require(path), start, stop))]
+    def AppendPacked(self, path: str, values: list[str]) -> None:
+        with self.lock:
+            object_id: int = self._Require(path)
+            count: int = self.CountPacked(path)
+            self.db.execute("BEGIN")
+            try:
+                self._AppendPacked(object_id, count, values)
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+    def WritePacked(self, path: str, values: list[str] | None) -> None:
+        with self.lock:
+            object_id: int = self._Require(path)
+            self.db.execute("BEGIN")
+            try:
+                self.db.execute("DELETE FROM packed WHERE object = ?", (object_id,))
+                self._WriteMeta(object_id, "__Packed__", None)
+                if values is not None:
+                    self._AppendPacked(object_id, 0, values)
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+    def _AppendPacked(self, object_id: int, count: int, values: list[str]) -> None:
+        # the caller holds the lock and the transaction, so the rows and the length commit together
+        self.db.executemany("INSERT INTO packed VALUES (?, ?, ?)", [(object_id, count + i, value) for i, value in enumerate(values)])
+        self._WriteMeta(object_id, "__Packed__", str(count + len(values)))
+    def GetBytecodeStore(self, root: str) -> str | None: # NOQA
+        return _BytecodeStore(root)
+    @contextmanager
+    def Checkout(self, path: str) -> Iterator[str]:
+        with tempfile.TemporaryDirectory(prefix="sulfur-") as local:
+            local = os.path.join(local, os.path.basename(path))
+            os.makedirs(os.path.join(local, "__Children__"))
+            content: str | None = self.ReadContent(path)
+            with open(os.path.join(local, "__Type__"), "w") as file:
+                file.write(self.ReadType(path) or "")
+            with open(os.path.join(local, "__Content__"), "w") as file:
+                file.write(content or "")
+            yield local
+            with open(os.path.join(local, "__Content__")) as file:
+                edited: str = file.read()
+            if edited != (content or ""):
+                self.WriteContent(path, edited)
+    def Reset(self, root: str) -> None:
+        with self.lock:
+            self.db.execute("DELETE FROM objects WHERE parent = ?", (self.ROOT_ID,))
+            self.db.execute("DELETE FROM meta WHERE object = ?", (self.ROOT_ID,))
+            self.db.execute("DELETE FROM meta_log WHERE object = ?", (self.ROOT_ID,))
+            shutil.rmtree(_BytecodeStore(root), ignore_errors=True)
+            self.ids = {self.root: self.ROOT_ID}
+    def Close(self) -> None:
+        with self.lock:
+            self.db.close()
+
+DIRECTORY_STORAGE: DirectoryStorage = DirectoryStorage()
+_mounts: dict[str, SQLiteStorage] = {} # {workspace file: storage}
+
+def IsSQLiteWorkspace(path: str) -> bool:
+    if os.path.isfile(path):
+        with open(path, "rb") as file:
+            return file.read(len(_SQLITE_HEADER)) == _SQLITE_HEADER
+    return not os.path.exists(path) and os.path.splitext(path)[1].lower() in SQLITE_SUFFIXES
+def Open(path: str) -> str:
+    # mounts path when it is (or should become) a SQLite workspace; objects below it then resolve to that storage
+    path = os.path.abspath(path)
+    if path not in _mounts and IsSQLiteWorkspace(path):
+        _mounts[path] = SQLiteStorage(path)
+    return path
+def GetStorage(path: str) -> DirectoryStorage | SQLiteStorage:
+    for root, storage in _mounts.items():
+        if path == root or path.startswith(root + os.sep):
+            return storage
+    return DIRECTORY_STORAGE
+
+_LOG_MIN: int = 1024 # changes a MetaLog keeps appending before it folds them into its snapshot, however small the snapshot
+
+class MetaLog:
+    # a meta entry kept as a JSON snapshot line followed by one [key, value] line per change, so a save costs the size of
+    # the changes rather than of the whole entry; the changes are folded into a new snapshot once they outnumber its keys
+    def __init__(self, path: str, key: str):
+        self.path: str = path
+        self.key: str = key
+        self.pending: dict[str, Any] = {} # {key: value, None to remove it} not saved yet
+        self.logged: int = 0 # changes stored after the snapshot
+        self.compact: bool = False
+    def Load(self) -> tuple[Any, list[tuple[str, Any]]]:
+        # (snapshot or None, changes to apply to it in order)
+        self.pending.clear()
+        self.logged = 0
+        text: str | None = GetStorage(self.path).ReadMeta(self.path, self.key)
+        if not text:
+            self.compact = True # the first save writes the snapshot line
+            return None, []
+        lines: list[str] = text.split("\n")
+        try:
+            snapshot: Any = json.loads(lines[0])
+        except ValueError:
+            self.compact = True
+            return None, []
+        # an entry written before the log existed has no trailing newline to append after
+        self.compact = not text.endswith("\n")
+        changes: list[tuple[str, Any]] = []
+        for line in lines[1:]:
+            if not line:
+                continue
+            try:
+                key, value = json.loads(line)
+            except ValueError:
+                self.compact = True # torn by an interrupted append; the next save rewrites the entry
+                break
+            changes.append((key, value))
+        self.logged = len(changes)
+        return snapshot, changes
+    def Record(self, key: str, value: Any) -> None:
+        self.pending[key] = value
+    def Save(self, snapshot: Callable[[], Any], size: int) -> None:
+        if not self.pending:
+            return
+        storage: DirectoryStorage | SQLiteStorage = GetStorage(self.path)
+        if self.compact or self.logged + len(self.pending) > max(_LOG_MIN, size):
+            storage.WriteMeta(self.path, self.key, json.dumps(snapshot(), separators=(",", ":")) + "\n")
+            self.logged = 0
+            self.compact = False
+        else:
+            storage.AppendMeta(self.path, self.key, "".join(json.dumps([key, value], separators=(",", ":")) + "\n" for key, value in self.pending.items()))
+            self.logged += len(self.pending)
+        self.pending.clear()
@@ -1,4 +1,4 @@
-import random, os, keyword, stat, re
+import random, os, keyword, stat, re, shutil, subprocess, sys
 from sys import argv
 from pathlib import Path
 from importlib import import_module
@@ -7,19 +7,33 @@ from readchar import readchar
 from questionary import select
 
 from .editor import Run
-from .pcl import Plugin
+from .pcl import Plugin, GetRegistry
 
 SEP: str = "\\" if os.name == "nt" else "/"
+MAX_WORKERS: int = min(8, (os.cpu_count() or 1) + 4) # thread pool size for refreshes, exports and loads
 
-def RedPrint(*s: str, sep: str = " ", exit_after: bool = True) -> None:
-    print(f"\033[91m{sep.join([str(i) for i in s])}\033[0m")
+_red_prints: tuple[int, str] = (0, "") # (RedPrint errors so far, last message), so -r can tell commands that failed without raising
+
+def RedPrint(*s: str, sep: str = " ", exit_after: bool = True, error: bool = True) -> None:
+    # error=False is for prompts and notices, which -r does not count as a failure
+    global _red_prints
+    message: str = sep.join([str(i) for i in s])
+    if error:
+        _red_prints = (_red_prints[0] + 1, message)
+    print(f"\033[91m{message}\033[0m")
     if exit_after:
         exit(1)
 
+def GetRedPrints() -> tuple[int, str]:
+    return _red_prints
 def GreenPrint(*s: str, sep: str = " ") -> None:
     print(f"\033[92m{sep.join([str(i) for i in s])}\033[0m")
 def GetCharVariant(order: int) -> str:
     return f"0{order}" if len(str(order)) == 1 else str(order)
+def ParseCharVariant(order_char: str) -> int | None:
+    if not order_char.isdecimal() or GetCharVariant(int(order_char)) != order_char:
+        return None
+    return int(order_char)
 def GetRandomColor(text: str, force: bool = False, minimum_brightness: int = 80, maximum_brightness: int = 255) -> str:
     if "-c" not in argv and not force:
         return text
@@ -34,8 +48,16 @@ def ForceRemove(func, path, _):
     """DO NOT CALL. ONLY USE LIKE THIS: shutil.rmtree(..., onerror=ForceRemove)"""
     os.chmod(path, stat.S_IWRITE)
     func(path)
+ANSI_ESCAPE: re.Pattern = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
 def LenNoColor(text: str) -> int:
-    return len(re.sub(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])", "", text))
+    return len(ANSI_ESCAPE.sub("", text))
+def WriteFrame(text: str, paged: bool = False) -> None:
+    pager: str | None = os.environ.get("PAGER") or ("less -R" if shutil.which("less") else None)
+    if paged and pager is not None and sys.stdout.isatty():
+        subprocess.run(pager, shell=True, input=text, text=True)
+        return
+    sys.stdout.write(text)
+    sys.stdout.flush()
 
 PY_KWS: list[str] = keyword.kwlist + keyword.softkwlist + ["..."]
 HIGHLIGHTS: dict[str, list[str]] = {
@@ -61,8 +83,10 @@ OBJECT_TYPE_LIST: list[str] = [
     "URL",
     "Class"
 ]
-for plugin in Plugin.GetEnabledPlugins():
-    OBJECT_TYPE_LIST += plugin.GetObjectTypes()
+BUILTIN_OBJECT_TYPES: list[str] = OBJECT_TYPE_LIST.copy()
+OBJECT_TYPE_LIST += GetRegistry().GetObjectTypes()
+def RefreshObjectTypes() -> None:
+    OBJECT_TYPE_LIST[:] = BUILTIN_OBJECT_TYPES + GetRegistry().GetObjectTypes()
 ANSI_COLORS: dict[int, str] = {
     30: "Black",
     31: "Red",
@@ -88,8 +112,8 @@ def RunEditor(file_name: str, highlights: list[str]) -> None:
     with open(str(Path(file_name).parent / "__Type__")) as file:
         file_type: str = file.read()
         if ":" in file_type:
-            ea = (Plugin.ReadConfig(Plugin.TraceObjectType(file_type))["Editor"] or {}).get("Enabled", True)
-            file_type = (Plugin.ReadConfig(Plugin.TraceObjectType(file_type))["Editor"] or {}).get("InheritsFrom") or "UnknownType"
+            ea = file_type in GetRegistry().editable_types
+            file_type = (GetRegistry().GetConfig(file_type)["Editor"] or {}).get("InheritsFrom") or "UnknownType"
     if ea:
         if file_type == "Boolean":
             with open(file_name, "w") as file:
@@ -106,7 +130,7 @@ def RunEditor(file_name: str, highlights: list[str]) -> None:
                 file.write(url)
         elif file_type == "Character":
             while True:
-                RedPrint("Enter one character (esc to cancel):", exit_after=False)
+                RedPrint("Enter one character (esc to cancel):", exit_after=False, error=False)
                 char: str = readchar()
                 if char == "\x1b":
                     break
@@ -172,7 +196,7 @@ def Interruptible(func, default = None) -> Callable:
         try:
             func(*args, **kwargs)
         except (KeyboardInterrupt, EOFError):
-            RedPrint(f"\nOperation cancelled.", exit_after=False)
+            RedPrint(f"\nOperation cancelled.", exit_after=False, error=False)
             return default
     return Wrapper
 def InterruptibleDecorator(default = None) -> Callable: